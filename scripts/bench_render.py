@@ -0,0 +1,256 @@
+"""Render benchmark suite.
+
+Generates synthetic plans (1 to 10,000 phases) and resume payloads with a
+growing number of entries per section, renders each one in a fresh Python
+process and records wall time, peak RSS, output size and pages per second.
+The layout, page, plan and image caches are emptied before every repeat, so
+the timings are of cold renders; a warm server or batch worker does better.
+Results are written as JSON and can be compared against a stored baseline:
+
+    python scripts/bench_render.py --out bench.json
+    python scripts/bench_render.py --baseline bench.json
+
+A run exits non-zero when any case is slower than the baseline by more than
+``--threshold``. Everything runs offline; peak RSS uses getrusage, so the
+numbers are only meaningful on Linux.
+"""
+from datetime import datetime, timezone
+import argparse
+import json
+import os
+import platform
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+PLAN_SIZES = (1, 10, 100, 1000, 10000)
+RESUME_SIZES = (1, 5, 20, 50)
+QUICK_PLAN_SIZES = (1, 10, 100)
+QUICK_RESUME_SIZES = (1, 5)
+
+PAGE_RE = re.compile(rb"/Type /Page[^s]")
+
+
+def synthetic_plan(phases, steps=3, tasks=6):
+    """A plan spec with ``phases`` phases, reusing the bundled plan's wording."""
+    from plan_spec import DEFAULT_SPEC
+
+    with open(DEFAULT_SPEC, encoding="utf-8") as f:
+        bundled = json.load(f)
+    words = [
+        task["text"] if isinstance(task, dict) else task
+        for section in bundled["sections"]
+        for step in section.get("steps", [])
+        for task in step["tasks"]
+    ]
+
+    sections = []
+    for p in range(phases):
+        sections.append({
+            "type": "phase",
+            "title": f"Phase {p + 1}: Synthetic Work Package",
+            "short_title": f"Phase {p + 1}",
+            "deliverables": "Synthetic deliverables",
+            "estimate": {"min": 2 + p % 4, "max": 3 + p % 4 + p % 3},
+            "steps": [
+                {
+                    "title": f"Step {p + 1}.{s + 1}: Synthetic Step",
+                    "summary": words[(p + s) % len(words)],
+                    "tasks": [words[(p * steps + s * tasks + t) % len(words)] for t in range(tasks)],
+                }
+                for s in range(steps)
+            ],
+            "break_after": "page" if p % 2 else "spacer",
+        })
+    sections.append({"type": "timeline", "heading": "📅 Project Timeline", "total_label": "Total"})
+    return {"title": f"Synthetic Plan ({phases} phases)", "subtitle": "Benchmark", "sections": sections}
+
+
+def synthetic_resume(entries):
+    """A FormData payload with ``entries`` items in each list section."""
+    return {
+        "fullName": "Benchmark Candidate",
+        "aboutMe": "Engineer focused on fast, reliable document rendering pipelines. " * 3,
+        "skills": [f"Skill {i}" for i in range(entries * 3)],
+        "education": [
+            {"institution": f"University {i}", "degree": "B.Sc. Computer Science", "year": str(2000 + i % 25)}
+            for i in range(entries)
+        ],
+        "projects": [
+            {
+                "title": f"Project {i}",
+                "description": "Built a service that renders documents at scale with bounded memory. " * 2,
+                "techUsed": "Python, ReportLab",
+                "githubLink": f"https://github.com/example/project-{i}",
+            }
+            for i in range(entries)
+        ],
+        "experience": [
+            {"company": f"Company {i}", "role": "Senior Engineer", "duration": f"{2000 + i % 25}-{2001 + i % 25}"}
+            for i in range(entries)
+        ],
+        "contact": {
+            "email": "candidate@example.com",
+            "phone": "+1 555 0100",
+            "linkedin": "linkedin.com/in/candidate",
+            "github": "github.com/candidate",
+        },
+    }
+
+
+def clear_caches():
+    """Drop everything a render leaves behind for the next one in this process."""
+    import images
+    import layout_cache
+    import page_layout
+    import plan_spec
+    import plan_toc
+
+    layout_cache.clear_caches()
+    page_layout.clear_cache()
+    plan_toc.clear_cache()
+    plan_spec.clear_memo()
+    images.image_cache().clear()
+
+
+def run_case(kind, size, repeats):
+    """Render one case in this process and return its measurements.
+
+    Every repeat starts from empty caches, so all of them time a cold
+    render rather than replaying layouts cached by the one before.
+    """
+    if kind == "plan":
+        from generate_project_plan import render_model
+        from plan_spec import compile_plan
+
+        spec = synthetic_plan(size)
+        render = lambda: render_model(compile_plan(spec), "Benchmark")
+    else:
+        from resume_renderer import render_resume
+
+        form_data = synthetic_resume(size)
+        render = lambda: render_resume(form_data, "modern-professional")
+
+    timings = []
+    for _ in range(repeats):
+        clear_caches()
+        start = time.perf_counter()
+        data = render()
+        timings.append(time.perf_counter() - start)
+
+    wall = statistics.median(timings)
+    pages = len(PAGE_RE.findall(data))
+    return {
+        "name": f"{kind}-{size}",
+        "kind": kind,
+        "size": size,
+        "repeats": repeats,
+        "wall_s": round(wall, 6),
+        "wall_min_s": round(min(timings), 6),
+        "pages": pages,
+        "bytes": len(data),
+        "pages_per_s": round(pages / wall, 2) if wall else None,
+        # ru_maxrss is in KiB on Linux
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def run_isolated(kind, size, repeats):
+    # A fresh interpreter per case keeps peak RSS from leaking between cases
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--case", kind, str(size), str(repeats)],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode:
+        raise RuntimeError(f"benchmark case {kind}-{size} failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline, threshold):
+    """Return a list of per-case comparisons against ``baseline``."""
+    previous = {case["name"]: case for case in baseline["cases"]}
+    report = []
+    for case in results["cases"]:
+        old = previous.get(case["name"])
+        if old is None:
+            continue
+        ratio = case["wall_s"] / old["wall_s"] if old["wall_s"] else None
+        report.append({
+            "name": case["name"],
+            "wall_s": case["wall_s"],
+            "baseline_wall_s": old["wall_s"],
+            "ratio": round(ratio, 3) if ratio else None,
+            "peak_rss_kb": case["peak_rss_kb"],
+            "baseline_peak_rss_kb": old["peak_rss_kb"],
+            "regressed": bool(ratio and ratio > 1 + threshold),
+        })
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark plan and resume rendering.")
+    parser.add_argument("--plans", type=int, nargs="*", help=f"plan sizes in phases (default: {PLAN_SIZES})")
+    parser.add_argument("--resumes", type=int, nargs="*", help=f"resume sizes in entries (default: {RESUME_SIZES})")
+    parser.add_argument("--quick", action="store_true", help="small sizes only, for CI smoke runs")
+    parser.add_argument("--repeats", type=int, default=3, help="renders per case; plans of 1000+ phases render once")
+    parser.add_argument("--out", help="write results JSON here")
+    parser.add_argument("--baseline", help="compare against this results JSON")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown ratio (default: 0.10)")
+    parser.add_argument("--case", nargs=3, metavar=("KIND", "SIZE", "REPEATS"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.case:
+        kind, size, repeats = args.case
+        print(json.dumps(run_case(kind, int(size), int(repeats))))
+        return 0
+
+    plan_sizes = args.plans if args.plans is not None else (QUICK_PLAN_SIZES if args.quick else PLAN_SIZES)
+    resume_sizes = args.resumes if args.resumes is not None else (QUICK_RESUME_SIZES if args.quick else RESUME_SIZES)
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "cases": [],
+    }
+    for kind, sizes in (("plan", plan_sizes), ("resume", resume_sizes)):
+        for size in sizes:
+            # Huge plans take long enough that a single render is a stable sample
+            repeats = 1 if kind == "plan" and size >= 1000 else args.repeats
+            case = run_isolated(kind, size, repeats)
+            results["cases"].append(case)
+            print(
+                f"{case['name']:>12}  {case['wall_s'] * 1000:10.1f} ms  {case['pages']:6d} pages  "
+                f"{case['pages_per_s'] or 0:8.1f} pages/s  {case['bytes'] / 1024:9.1f} KiB  "
+                f"{case['peak_rss_kb'] / 1024:7.1f} MiB RSS",
+                file=sys.stderr,
+            )
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            results["comparison"] = compare(results, json.load(f), args.threshold)
+        for row in results["comparison"]:
+            flag = "REGRESSED" if row["regressed"] else "ok"
+            print(f"{row['name']:>12}  x{row['ratio']}  {flag}", file=sys.stderr)
+            if row["regressed"]:
+                status = 1
+
+    output = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
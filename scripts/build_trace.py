@@ -0,0 +1,222 @@
+"""Opt-in instrumentation of ReportLab document builds.
+
+BuildTrace.attach(doc) hooks a SimpleDocTemplate's build lifecycle and times
+every top-level flowable (including the pieces produced by splitting it) as
+it is wrapped, split and drawn, plus each page and the final serialization
+and compression in ``canv.save()``. The trace is exported in the Chrome
+trace event format, so it opens in chrome://tracing, Perfetto or speedscope,
+with a summary of the slowest flowables under ``otherData``.
+
+Nothing is patched unless a trace is attached, so normal builds pay nothing.
+MemoryMeter is lighter: it samples the process's resident set size from a
+page callback, and every plan build reports its peak in ``build_stats``.
+"""
+from time import perf_counter
+import json
+import os
+import threading
+
+
+def current_rss_kb():
+    """Resident set size of this process in KiB.
+
+    Reads /proc on Linux; elsewhere falls back to the peak so far.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class MemoryMeter:
+    """Tracks peak RSS across the builds it is attached to, sampled per page."""
+
+    def __init__(self):
+        self.start_kb = self.peak_kb = current_rss_kb()
+
+    def sample(self, page=None):
+        rss = current_rss_kb()
+        if rss > self.peak_kb:
+            self.peak_kb = rss
+
+    def attach(self, doc):
+        """Sample at the end of every page of ``doc``'s next build. Returns ``doc``."""
+        doc.setPageCallBack(self.sample)
+        return doc
+
+    def stats(self):
+        self.sample()
+        return {"peak_rss_kb": self.peak_kb, "rss_growth_kb": self.peak_kb - self.start_kb}
+
+
+def _label(flowable):
+    name = type(flowable).__name__
+    text = getattr(flowable, "text", None)
+    if isinstance(text, str) and text.strip():
+        snippet = " ".join(text.split())
+        return f"{name}: {snippet[:48]}{'…' if len(snippet) > 48 else ''}"
+    return name
+
+
+class BuildTrace:
+    """Collects timed spans from one or more document builds."""
+
+    def __init__(self):
+        self.events = []
+        self.flowables = {}
+        self.pages = 0
+        self._origin = perf_counter()
+        self._pid = os.getpid()
+        self._tid = threading.get_ident()
+        self._page_start = None
+        self._doc = None
+        self._next_id = 0
+
+    def _us(self, t):
+        return round((t - self._origin) * 1e6, 1)
+
+    def span(self, name, category, start, end, **args):
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": self._us(start),
+            "dur": round((end - start) * 1e6, 1),
+            "pid": self._pid,
+            "tid": self._tid,
+        }
+        if args:
+            event["args"] = args
+        self.events.append(event)
+
+    def _record(self, flowable, phase, seconds):
+        key = flowable.__dict__["_build_trace_id"]
+        stats = self.flowables.get(key)
+        if stats is None:
+            stats = self.flowables[key] = {
+                "flowable": _label(flowable),
+                "page": self._doc.page if self._doc else None,
+                "wrap_ms": 0.0,
+                "split_ms": 0.0,
+                "draw_ms": 0.0,
+            }
+        stats[f"{phase}_ms"] += seconds * 1000
+
+    def _timed(self, flowable, phase, method):
+        def timed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                result = method(*args, **kwargs)
+            finally:
+                end = perf_counter()
+                self._record(flowable, phase, end - start)
+                self.span(phase, phase, start, end, flowable=_label(flowable))
+            # Pieces returned by split are new flowables; trace them too
+            if phase == "split":
+                for piece in result:
+                    self._instrument(piece)
+            return result
+        return timed
+
+    def _instrument(self, flowable):
+        if "_build_trace_id" in flowable.__dict__:
+            return
+        self._next_id += 1
+        flowable._build_trace_id = self._next_id
+        flowable.wrap = self._timed(flowable, "wrap", flowable.wrap)
+        flowable.split = self._timed(flowable, "split", flowable.split)
+        flowable.drawOn = self._timed(flowable, "draw", flowable.drawOn)
+
+    def attach(self, doc):
+        """Hook ``doc`` so its next build() is traced. Returns ``doc``."""
+        self._doc = doc
+        handle_flowable = doc.handle_flowable
+        handle_pageBegin = doc.handle_pageBegin
+        handle_pageEnd = doc.handle_pageEnd
+        end_build = doc._endBuild
+
+        def traced_flowable(flowables):
+            flowable = flowables[0]
+            self._instrument(flowable)
+            start = perf_counter()
+            try:
+                return handle_flowable(flowables)
+            finally:
+                self.span(_label(flowable), "flowable", start, perf_counter())
+
+        def traced_page_begin():
+            self._page_start = perf_counter()
+            return handle_pageBegin()
+
+        def traced_page_end():
+            start = perf_counter()
+            try:
+                return handle_pageEnd()
+            finally:
+                end = perf_counter()
+                self.pages += 1
+                self.span("showPage", "page_emit", start, end)
+                if self._page_start is not None:
+                    self.span(f"page {self.pages}", "page", self._page_start, end, page=self.pages)
+
+        def traced_end_build():
+            start = perf_counter()
+            try:
+                return end_build()
+            finally:
+                self.span("save", "save", start, perf_counter())
+
+        doc.handle_flowable = traced_flowable
+        doc.handle_pageBegin = traced_page_begin
+        doc.handle_pageEnd = traced_page_end
+        doc._endBuild = traced_end_build
+        return doc
+
+    def summary(self, top=10):
+        totals = {}
+        for event in self.events:
+            if event["cat"] in ("wrap", "split", "draw", "page_emit", "save"):
+                totals[event["cat"]] = totals.get(event["cat"], 0.0) + event["dur"] / 1000
+        slowest = sorted(
+            self.flowables.values(),
+            key=lambda s: s["wrap_ms"] + s["split_ms"] + s["draw_ms"],
+            reverse=True,
+        )[:top]
+        return {
+            "pages": self.pages,
+            "flowables": len(self.flowables),
+            "total_ms": round(max((e["ts"] + e["dur"] for e in self.events), default=0) / 1000, 3),
+            "by_phase_ms": {phase: round(ms, 3) for phase, ms in totals.items()},
+            "slowest": [
+                dict(
+                    stats,
+                    wrap_ms=round(stats["wrap_ms"], 3),
+                    split_ms=round(stats["split_ms"], 3),
+                    draw_ms=round(stats["draw_ms"], 3),
+                    total_ms=round(stats["wrap_ms"] + stats["split_ms"] + stats["draw_ms"], 3),
+                )
+                for stats in slowest
+            ],
+        }
+
+    def to_chrome(self, top=10):
+        return {
+            "traceEvents": self.events,
+            "displayTimeUnit": "ms",
+            "otherData": {"summary": self.summary(top)},
+        }
+
+    def write(self, path, top=10):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome(top), f, ensure_ascii=False)
+
+
+def print_summary(summary):
+    print(f"⏱️ Build trace: {summary['pages']} pages, {summary['flowables']} flowables, {summary['total_ms']:.1f} ms")
+    for phase, ms in summary["by_phase_ms"].items():
+        print(f"   {phase:<10} {ms:9.1f} ms")
+    print("   Slowest flowables:")
+    for stats in summary["slowest"]:
+        print(f"   {stats['total_ms']:9.2f} ms  p{stats['page']}  {stats['flowable']}")
@@ -0,0 +1,268 @@
+"""Command-line entry point for the document renderers.
+
+    python scripts/buildfolio.py render plan [SPEC] [-o OUT] [--toc] [--workers N | --stream | --trace FILE] [--reproducible]
+    python scripts/buildfolio.py render resume RECORD.json [--template ID] [-o OUT] [--reproducible]
+    python scripts/buildfolio.py batch INPUT.jsonl --out-dir DIR [--workers N]
+    python scripts/buildfolio.py validate SPEC [SPEC ...]
+    python scripts/buildfolio.py estimate SPEC [SPEC ...] [--samples N] [--seed S]
+    python scripts/buildfolio.py page-count plan [SPEC]
+    python scripts/buildfolio.py page-count resume RECORD.json
+    python scripts/buildfolio.py layout plan [SPEC] [--toc]
+    python scripts/buildfolio.py layout resume RECORD.json [--template ID]
+    python scripts/buildfolio.py thumbnails [--out DIR] [--workers N] [--force]
+
+Short-lived jobs call this thousands of times a day, so only argparse and sys
+are imported up front; each subcommand imports what it needs when it runs.
+``validate`` never loads ReportLab at all. scripts/check_import_time.py keeps
+it that way.
+"""
+import argparse
+import sys
+
+
+def _read_json(path):
+    import json
+
+    if path == "-":
+        return json.load(sys.stdin)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _resume_args(record, template=None):
+    # RECORD is either a bare FormData payload or a stream_render.py record
+    if "formData" in record:
+        return record["formData"], template or record.get("template")
+    return record, template
+
+
+def _plan_model(args):
+    from plan_spec import DEFAULT_TOC_TITLE, load_plan
+
+    model = load_plan(args.source)
+    if args.toc and not model["toc"]:
+        model = dict(model, toc=DEFAULT_TOC_TITLE)
+    return model
+
+
+def _write(data, output):
+    if output == "-":
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+        return
+    with open(output, "wb") as f:
+        f.write(data)
+    print(f"✅ Wrote {output} ({len(data) / 1024:.1f} KiB)", file=sys.stderr)
+
+
+# Options that only apply to one kind of document, by the kind they apply to
+PLAN_OPTIONS = ("trace", "toc", "workers", "stream")
+RESUME_OPTIONS = ("template",)
+# Plan options build_plan_pdf cannot honour together: traced and streaming
+# builds are always serial
+PLAN_CONFLICTS = (("trace", "workers"), ("stream", "workers"))
+
+
+def cmd_render(args):
+    ignored = RESUME_OPTIONS if args.kind == "plan" else PLAN_OPTIONS
+    given = [f"--{name}" for name in ignored if getattr(args, name) not in (None, False)]
+    if given:
+        print(f"render {args.kind}: {', '.join(given)} cannot be used with {args.kind}s", file=sys.stderr)
+        return 2
+    if args.kind == "plan":
+        for first, second in PLAN_CONFLICTS:
+            if getattr(args, first) and getattr(args, second) is not None:
+                print(f"render plan: --{first} cannot be combined with --{second}", file=sys.stderr)
+                return 2
+        if args.trace and args.output == "-":
+            # The trace summary goes to stdout, which holds the PDF
+            print("render plan: --trace needs an output file, not -o -", file=sys.stderr)
+            return 2
+    if args.reproducible:
+        import reproducible
+
+        reproducible.enable()
+    if args.kind == "plan":
+        from generate_project_plan import create_project_plan_pdf, render_model
+
+        if args.output == "-":
+            _write(render_model(_plan_model(args), workers=args.workers, stream=args.stream), "-")
+        else:
+            create_project_plan_pdf(
+                args.source, args.output or "Portfolio_Resume_Builder_Project_Plan.pdf", args.trace, args.toc, args.workers, args.stream
+            )
+        return 0
+
+    from resume_renderer import render_resume, resume_filename
+
+    if args.source is None:
+        print("render resume: RECORD is required", file=sys.stderr)
+        return 2
+    form_data, template = _resume_args(_read_json(args.source), args.template)
+    _write(render_resume(form_data, template), args.output or resume_filename(form_data, template))
+    return 0
+
+
+def cmd_batch(args):
+    import stream_render
+
+    return stream_render.main(args.argv)
+
+
+def cmd_thumbnails(args):
+    import template_thumbnails
+
+    argv = ["--force"] if args.force else []
+    if args.out:
+        argv += ["--out", args.out]
+    if args.workers:
+        argv += ["--workers", str(args.workers)]
+    return template_thumbnails.main(argv)
+
+
+def cmd_validate(args):
+    from plan_spec import PlanSpecError, load_plan
+
+    status = 0
+    for path in args.specs:
+        try:
+            model = load_plan(path, use_cache=not args.no_cache)
+        except (OSError, ValueError) as e:
+            # PlanSpecError and JSON/YAML syntax errors are both ValueErrors
+            kind = "invalid" if isinstance(e, PlanSpecError) else type(e).__name__
+            print(f"❌ {path}: {kind}: {e}", file=sys.stderr)
+            status = 1
+        else:
+            print(f"✅ {path}: {len(model['blocks'])} blocks, {model['total_estimate']}")
+    return status
+
+
+def cmd_estimate(args):
+    from plan_spec import PlanSpecError, format_estimate, load_plan
+    from schedule import simulate, summarize
+
+    try:
+        models = [load_plan(path) for path in args.specs]
+    except (OSError, ValueError) as e:
+        kind = "invalid" if isinstance(e, PlanSpecError) else type(e).__name__
+        print(f"❌ {kind}: {e}", file=sys.stderr)
+        return 1
+
+    # One batched simulation for every spec on the command line
+    percentiles = simulate([m["schedule"] for m in models], args.samples, seed=args.seed) if args.samples else None
+    for i, (path, model) in enumerate(zip(args.specs, models)):
+        summary = summarize(model["schedule"])
+        line = f"{path}: effort {format_estimate(*summary['total'])}, critical path {format_estimate(*summary['critical_path'])}"
+        if percentiles is not None:
+            p50, p90 = percentiles[i]
+            line += f", P50 {p50:.1f} hours, P90 {p90:.1f} hours"
+        print(line)
+    return 0
+
+
+def cmd_page_count(args):
+    from io import BytesIO
+
+    if args.kind == "plan":
+        from generate_project_plan import build_plan_pdf
+
+        doc = build_plan_pdf(_plan_model(args), BytesIO())
+        if args.toc:
+            print(f"layout passes: {doc.build_stats['passes']}", file=sys.stderr)
+    else:
+        from resume_renderer import build_resume_pdf
+
+        if args.source is None:
+            print("page-count resume: RECORD is required", file=sys.stderr)
+            return 2
+        form_data, template = _resume_args(_read_json(args.source), args.template)
+        doc = build_resume_pdf(form_data, template, BytesIO())
+    print(doc.page)
+    return 0
+
+
+def cmd_layout(args):
+    import json
+
+    from page_layout import LayoutUnsupported
+
+    try:
+        if args.kind == "plan":
+            from generate_project_plan import plan_layout
+
+            result = plan_layout(_plan_model(args))
+        else:
+            from resume_renderer import resume_layout
+
+            if args.source is None:
+                print("layout resume: RECORD is required", file=sys.stderr)
+                return 2
+            form_data, template = _resume_args(_read_json(args.source), args.template)
+            result = resume_layout(form_data, template)
+    except LayoutUnsupported as e:
+        print(f"❌ {e}; use page-count for a full build", file=sys.stderr)
+        return 1
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="buildfolio", description="Render BuildFolio plans and resumes to PDF.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    render = commands.add_parser("render", help="render one plan or resume")
+    render.add_argument("kind", choices=("plan", "resume"))
+    render.add_argument("source", nargs="?", help="plan spec (default: bundled plan) or resume record JSON, - for stdin")
+    render.add_argument("-o", "--output", help="output PDF path, or - for stdout")
+    render.add_argument("--template", help="resume template id (default: the record's, else modern-professional)")
+    render.add_argument("--trace", help="plans only: write a Chrome trace of the build here")
+    render.add_argument("--toc", action="store_true", help="plans only: add a table of contents")
+    render.add_argument("--workers", type=int, help="plans only: lay out page-break chunks in this many processes")
+    render.add_argument("--stream", action="store_true", help="plans only: build from a flowable stream to reduce (not bound) memory on very large plans")
+    render.add_argument("--reproducible", action="store_true", help="identical input renders to identical bytes (see reproducible.py)")
+    render.set_defaults(func=cmd_render)
+
+    batch = commands.add_parser("batch", help="render a JSONL stream of records (see stream_render.py)", add_help=False)
+    batch.add_argument("argv", nargs=argparse.REMAINDER)
+    batch.set_defaults(func=cmd_batch)
+
+    validate = commands.add_parser("validate", help="check plan specs without rendering")
+    validate.add_argument("specs", nargs="+", metavar="SPEC")
+    validate.add_argument("--no-cache", action="store_true", help="recompile instead of using the compiled-plan cache")
+    validate.set_defaults(func=cmd_validate)
+
+    estimate = commands.add_parser("estimate", help="print plan effort, critical path and Monte Carlo completion times")
+    estimate.add_argument("specs", nargs="+", metavar="SPEC")
+    estimate.add_argument("--samples", type=int, default=1000, help="Monte Carlo samples per plan, 0 to skip (needs NumPy)")
+    estimate.add_argument("--seed", type=int, help="random seed for reproducible percentiles")
+    estimate.set_defaults(func=cmd_estimate)
+
+    page_count = commands.add_parser("page-count", help="lay a document out and print its page count")
+    page_count.add_argument("kind", choices=("plan", "resume"))
+    page_count.add_argument("source", nargs="?", help="plan spec (default: bundled plan) or resume record JSON")
+    page_count.add_argument("--template", help="resume template id")
+    page_count.add_argument("--toc", action="store_true", help="plans only: include a table of contents")
+    page_count.set_defaults(func=cmd_page_count)
+
+    layout = commands.add_parser("layout", help="print page count, section pages and page breaks without rendering")
+    layout.add_argument("kind", choices=("plan", "resume"))
+    layout.add_argument("source", nargs="?", help="plan spec (default: bundled plan) or resume record JSON")
+    layout.add_argument("--template", help="resume template id")
+    layout.add_argument("--toc", action="store_true", help="plans only: include a table of contents")
+    layout.set_defaults(func=cmd_layout)
+
+    thumbnails = commands.add_parser("thumbnails", help="render template picker thumbnails (see template_thumbnails.py)")
+    thumbnails.add_argument("--out", help="output directory (default: public/thumbnails)")
+    thumbnails.add_argument("--workers", type=int, help="rasterize changed templates in this many processes")
+    thumbnails.add_argument("--force", action="store_true", help="rebuild every template, changed or not")
+    thumbnails.set_defaults(func=cmd_thumbnails)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
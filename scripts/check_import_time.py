@@ -0,0 +1,100 @@
+"""Import-time budget check for the renderer entry points.
+
+Imports each module in a fresh interpreter with ``python -X importtime``,
+takes the cumulative time of the module itself and fails when it exceeds
+its budget, or when a module that must stay light pulls in ReportLab:
+
+    python scripts/check_import_time.py
+    python scripts/check_import_time.py --scale 2    # slower CI machines
+
+Each module is measured ``--repeats`` times and the fastest run counts, so a
+noisy neighbour does not fail the check. Exits 1 on any regression.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Budgets in milliseconds, roughly 2x what a warm run takes on a laptop
+BUDGETS_MS = {
+    "buildfolio": 40,
+    "plan_spec": 50,
+    "generate_project_plan": 300,
+    "resume_renderer": 300,
+    "stream_render": 90,
+}
+
+# Modules that must not import ReportLab when imported on their own
+NO_REPORTLAB = ("buildfolio", "plan_spec", "stream_render")
+
+
+def measure(module, code=None):
+    """Return ``(cumulative_ms, imported_module_names)`` for importing ``module``."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code or f"import {module}"],
+        cwd=SCRIPTS_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode:
+        raise RuntimeError(f"importing {module} failed:\n{proc.stderr}")
+
+    cumulative_us = None
+    imported = set()
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        name = name.strip()
+        imported.add(name)
+        if name == module:
+            cumulative_us = int(cumulative)
+    if cumulative_us is None:
+        raise RuntimeError(f"no importtime entry for {module}")
+    return cumulative_us / 1000, imported
+
+
+def check(modules, scale=1.0, repeats=3):
+    failures = []
+    for module in modules:
+        runs = [measure(module) for _ in range(repeats)]
+        ms = min(run[0] for run in runs)
+        imported = runs[0][1]
+        budget = BUDGETS_MS[module] * scale
+        ok = ms <= budget
+        print(f"{module:<24} {ms:8.1f} ms  budget {budget:6.1f} ms  {'ok' if ok else 'OVER BUDGET'}")
+        if not ok:
+            failures.append(f"{module} took {ms:.1f} ms (budget {budget:.1f} ms)")
+        if module in NO_REPORTLAB and "reportlab" in imported:
+            failures.append(f"{module} imports reportlab")
+
+    # The validate path must stay ReportLab-free end to end
+    code = "import buildfolio, sys; buildfolio.main(['validate', 'project_plan.json']); assert 'reportlab' not in sys.modules"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=SCRIPTS_DIR, capture_output=True, text=True)
+    if proc.returncode:
+        failures.append(f"buildfolio validate imports reportlab or failed:\n{proc.stderr}")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fail when renderer import time regresses.")
+    parser.add_argument("modules", nargs="*", help=f"modules to check (default: {', '.join(BUDGETS_MS)})")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget by this factor")
+    parser.add_argument("--repeats", type=int, default=3, help="imports per module; the fastest counts")
+    args = parser.parse_args(argv)
+
+    unknown = [module for module in args.modules if module not in BUDGETS_MS]
+    if unknown:
+        parser.error(f"no budget for {', '.join(unknown)}")
+
+    failures = check(args.modules or list(BUDGETS_MS), args.scale, args.repeats)
+    for failure in failures:
+        print(f"❌ {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+"""Input-handling checks for the renderers and the CLI.
+
+Each check feeds one kind of bad or unusual input to the code that must
+cope with it, and fails unless it is handled the documented way: rejected
+with the right error or exit status, and nothing written where it should
+not be. Checks run in this process, in a scratch directory:
+
+    python scripts/check_inputs.py
+    python scripts/check_inputs.py cli_trace_with_workers    # just the named checks
+
+Exits 1 on any failure.
+"""
+from contextlib import redirect_stderr, redirect_stdout
+from io import StringIO
+import argparse
+import os
+import sys
+import tempfile
+
+CHECKS = {}
+
+
+class CheckFailed(Exception):
+    pass
+
+
+def check(func):
+    CHECKS[func.__name__] = func
+    return func
+
+
+def expect(condition, message):
+    if not condition:
+        raise CheckFailed(message)
+
+
+def run_cli(argv):
+    """``(exit status, stderr)`` of ``buildfolio`` run with ``argv``."""
+    import buildfolio
+
+    err = StringIO()
+    with redirect_stderr(err), redirect_stdout(StringIO()):
+        status = buildfolio.main(argv)
+    return status, err.getvalue()
+
+
+@check
+def cli_trace_with_workers(tmp):
+    out = os.path.join(tmp, "plan.pdf")
+    status, err = run_cli(["render", "plan", "-o", out, "--trace", os.path.join(tmp, "t.json"), "--workers", "2"])
+    expect(status == 2, f"exit status {status}, expected 2")
+    expect("--workers" in err, f"error does not name --workers: {err!r}")
+    expect(not os.path.exists(out), "a PDF was written anyway")
+
+
+@check
+def cli_stream_with_workers(tmp):
+    status, _ = run_cli(["render", "plan", "-o", os.path.join(tmp, "plan.pdf"), "--stream", "--workers", "2"])
+    expect(status == 2, f"exit status {status}, expected 2")
+
+
+@check
+def cli_trace_to_stdout(tmp):
+    trace = os.path.join(tmp, "t.json")
+    status, err = run_cli(["render", "plan", "-o", "-", "--trace", trace])
+    expect(status == 2, f"exit status {status}, expected 2")
+    expect("--trace" in err, f"error does not name --trace: {err!r}")
+    expect(not os.path.exists(trace), "a trace was written anyway")
+
+
+@check
+def cli_plan_options_for_resume(tmp):
+    record = os.path.join(tmp, "resume.json")
+    with open(record, "w", encoding="utf-8") as f:
+        f.write('{"fullName": "A B"}')
+    status, err = run_cli(["render", "resume", record, "-o", os.path.join(tmp, "r.pdf"), "--workers", "2"])
+    expect(status == 2, f"exit status {status}, expected 2")
+
+
+@check
+def batch_job_id_traversal(tmp):
+    from resume_renderer import render_batch
+
+    out = os.path.join(tmp, "out")
+    jobs = [{"id": job_id, "formData": {"fullName": "A B"}} for job_id in ("../escaped", "/tmp/abs", "..", "sub/../../up")]
+    paths = [path for path, _ in render_batch(jobs, out, workers=1)]
+    expect(all(os.path.dirname(path) == out for path in paths), f"written outside the output directory: {paths}")
+    expect(os.listdir(tmp) == ["out"], f"files next to the output directory: {os.listdir(tmp)}")
+
+    # A symlink in the output directory pointing out of it is refused
+    os.symlink(os.path.join(tmp, "outside.pdf"), os.path.join(out, "link.pdf"))
+    try:
+        list(render_batch([{"id": "link", "formData": {"fullName": "A B"}}], out, workers=1))
+    except ValueError:
+        pass
+    else:
+        raise CheckFailed("a job id naming a symlink out of the output directory was written")
+    expect(not os.path.exists(os.path.join(tmp, "outside.pdf")), "the symlink target was written")
+
+
+@check
+def server_rejects_bad_records(tmp):
+    import asyncio
+    from render_server import RenderServer
+
+    # Turned away before any worker is involved: the server has no pool
+    server = RenderServer(cache_bytes=0)
+    for body, status in [
+        (b"[]", 400),
+        (b'{"nothing": 1}', 400),
+        (b'{"formData": []}', 422),
+        (b'{"formData": {"photo": 5}}', 422),
+        (b'{"formData": {"experience": ["x"]}}', 422),
+        (b'{"plan": {"phases": 5}}', 422),
+        (b'{"formData": {"skills": [1]}, "encrypt": {"user_password": "x"}}', 422),
+    ]:
+        got, _, payload = asyncio.run(server.render(body, {}))
+        expect(got == status, f"{body!r}: status {got}, expected {status} ({payload!r})")
+
+
+@check
+def server_replaces_broken_pool(tmp):
+    import asyncio
+    import signal
+    from render_server import RenderServer
+
+    async def run():
+        server = RenderServer(workers=1, cache_bytes=0)
+        server.start_pool()
+        try:
+            worker = server.pool.submit(os.getpid).result()
+            os.kill(worker, signal.SIGKILL)
+            status, _, payload = await server.render(b'{"formData": {"fullName": "A B"}}', {})
+            return status, payload, server.counters["pool_restarts"]
+        finally:
+            server.stop_pool()
+
+    status, payload, restarts = asyncio.run(run())
+    expect(status == 200, f"status {status} after a worker died: {payload!r}")
+    expect(restarts == 1, f"{restarts} pool restarts, expected 1")
+
+
+@check
+def fallback_text_keeps_bold(tmp):
+    from fonts import fallback_fonts
+    from resume_renderer import render_resume
+
+    expect(any(face == "DejaVuSans-Bold" for _, face, _ in fallback_fonts()),
+           "needs DejaVuSans.ttf and DejaVuSans-Bold.ttf on BUILDFOLIO_FONT_PATH or in a system font directory")
+    # The name is set in a bold style, the experience role in <b>
+    pdf = render_resume({"fullName": "Łukasz Ωmega", "experience": [{"company": "ACME", "role": "Σ team"}]})
+    expect(b"DejaVuSans-Bold" in pdf, "bold fallback text was not drawn in DejaVuSans-Bold")
+    pdf = render_resume({"aboutMe": "Plain Ωmega"})
+    expect(b"DejaVuSans-Bold" not in pdf, "regular fallback text was drawn in DejaVuSans-Bold")
+
+
+def _plan(*sections):
+    return {"title": "T", "sections": list(sections)}
+
+
+@check
+def plan_spec_field_types(tmp):
+    from plan_spec import PlanSpecError, compile_plan
+
+    phase = {"type": "phase", "title": "P", "estimate": [1, 2], "steps": [{"title": "S"}]}
+    for spec, path in [
+        (_plan({"heading": "H", "body": 5}), "sections[0].body"),
+        (_plan({"heading": "H", "groups": {}}), "sections[0].groups"),
+        (_plan({"heading": "H", "groups": [{"heading": "G", "summary": ["x"]}]}), "sections[0].groups[0].summary"),
+        (_plan({"heading": "H", "groups": ["G"]}), "sections[0].groups[0]"),
+        (_plan({"heading": "H", "break_after": "spacer", "spacer": "big"}), "sections[0].spacer"),
+        (_plan(dict(phase, steps=5)), "sections[0].steps"),
+        (_plan(dict(phase, steps=["S"])), "sections[0].steps[0]"),
+        (_plan(dict(phase, steps=[{"title": "S", "tasks": 3}])), "sections[0].steps[0].tasks"),
+        (_plan(dict(phase, steps=[{"title": "S", "summary": 1}])), "sections[0].steps[0].summary"),
+        (_plan(dict(phase, steps=[{"title": "S", "tasks": [7]}])), "sections[0].steps[0].tasks[0]"),
+        (_plan({"type": "timeline", "heading": "H"}, dict(phase, short_title=1)), "sections[1].short_title"),
+        (_plan(phase, {"type": "timeline", "heading": "H", "columns": "abc"}), "sections[1].columns"),
+        (_plan(phase, {"type": "timeline", "heading": "H", "total_label": 0}), "sections[1].total_label"),
+        (dict(_plan(), subtitle=2), "spec.subtitle"),
+        (dict(_plan(), toc={"title": 2}), "spec.toc.title"),
+    ]:
+        try:
+            compile_plan(spec)
+        except PlanSpecError as e:
+            expect(path in str(e), f"error for {path} does not name it: {e}")
+        else:
+            raise CheckFailed(f"no error for an invalid {path}")
+
+
+@check
+def cli_validate_invalid_spec(tmp):
+    spec = os.path.join(tmp, "plan.json")
+    with open(spec, "w", encoding="utf-8") as f:
+        f.write('{"title": "T", "sections": [{"heading": "H", "body": 5}]}')
+    status, err = run_cli(["validate", "--no-cache", spec])
+    expect(status == 1, f"exit status {status}, expected 1")
+    expect("invalid: sections[0].body" in err, f"unexpected error output: {err!r}")
+
+
+@check
+def disk_cache_overwrite_size(tmp):
+    from render_cache import RenderCache
+
+    cache = RenderCache(max_bytes=0, directory=tmp, max_disk_bytes=1000)
+    cache.put("aa" * 32, b"x" * 100)
+    for _ in range(50):
+        cache.put("bb" * 32, b"x" * 100)
+    on_disk = sum(size for _, size, _ in cache._disk_entries())
+    expect(cache._disk_size == on_disk, f"tracked disk size {cache._disk_size}, {on_disk} bytes on disk")
+    expect(cache.get("aa" * 32) is not None, "overwriting one entry evicted another")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check how the renderers handle bad input.")
+    parser.add_argument("checks", nargs="*", help=f"checks to run (default: all {len(CHECKS)})")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.checks if name not in CHECKS]
+    if unknown:
+        parser.error(f"no check named {', '.join(unknown)}")
+
+    failures = []
+    for name in args.checks or list(CHECKS):
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                CHECKS[name](tmp)
+                failure = None
+            except CheckFailed as e:
+                failure = str(e)
+            except Exception as e:
+                failure = f"{type(e).__name__}: {e}"
+        print(f"{name:<40} {'FAILED' if failure else 'ok'}")
+        if failure:
+            failures.append(f"{name}: {failure}")
+    for failure in failures:
+        print(f"❌ {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""Byte-for-byte reproducibility check for the renderers.
+
+Renders a fixed set of documents in reproducible mode (see reproducible.py)
+in two fresh interpreters with different hash seeds. Each interpreter first
+renders every document with the paragraph layout caches off, then RENDERS
+more times with them on, so later renders hit warm caches the way a server
+or batch worker does. The check fails unless all of these produce
+identical bytes and those match the SHA-256 digests recorded in
+reproducible_golden.json:
+
+    python scripts/check_reproducible.py
+    python scripts/check_reproducible.py --update    # after an intended output change
+
+The recorded digests only hold for the environment they were recorded in:
+the ReportLab, Pillow and zlib versions and the fallback fonts found all
+change the bytes. In any other environment the two runs are still compared
+with each other, and the golden comparison is skipped with a note.
+Exits 1 on any difference.
+"""
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+GOLDEN = os.path.join(SCRIPTS_DIR, "reproducible_golden.json")
+
+# 2026-01-01 UTC; any fixed date does
+EPOCH = 1767225600
+HASH_SEEDS = ("1", "2")
+# Cached renders of each document per interpreter, after the uncached one
+RENDERS = 2
+
+
+def environment():
+    """What the golden digests depend on besides the code."""
+    from PIL import __version__ as pillow
+    import reportlab
+    import zlib
+
+    from fonts import fingerprint
+
+    return {
+        "reportlab": reportlab.Version,
+        "pillow": pillow,
+        "zlib": zlib.ZLIB_RUNTIME_VERSION,
+        "fonts": [name for name, *_ in fingerprint()],
+    }
+
+
+def split_paragraph_plan(every_step=False):
+    """A plan with steps that repeat a long multi-fragment paragraph split across pages."""
+    from bench_render import synthetic_plan
+    from plan_spec import compile_plan
+
+    text = " ".join(f"Milestone {i} covers <b>review {i}</b> and <i>sign-off</i> &amp; rollout." for i in range(60))
+    spec = synthetic_plan(4)
+    steps = [step for section in spec["sections"] for step in section.get("steps", [])]
+    for step in steps if every_step else steps[:1]:
+        step["summary"] = text
+        step["tasks"] = [f"• {text}"] * 3
+    return compile_plan(spec)
+
+
+def fixtures():
+    """``(name, render)`` for every document checked."""
+    from bench_render import synthetic_resume
+    from generate_project_plan import render_model
+    from plan_spec import DEFAULT_TOC_TITLE, load_plan
+    from resume_renderer import load_templates, render_resume
+
+    model = load_plan()
+    toc_model = dict(model, toc=DEFAULT_TOC_TITLE)
+    split_model = split_paragraph_plan()
+    repeated_split_model = split_paragraph_plan(every_step=True)
+    cases = [
+        ("plan", lambda: render_model(model)),
+        ("plan-stream", lambda: render_model(model, stream=True)),
+        ("plan-toc", lambda: render_model(toc_model)),
+        ("plan-parallel", lambda: render_model(model, workers=2)),
+        ("plan-toc-parallel", lambda: render_model(toc_model, workers=2)),
+        ("plan-split-paragraphs", lambda: render_model(split_model)),
+        ("plan-split-paragraphs-repeated", lambda: render_model(repeated_split_model)),
+    ]
+    resume = dict(synthetic_resume(3), photo="/placeholder-user.jpg", logo="/placeholder-logo.png")
+    for template_id in load_templates():
+        cases.append((f"resume-{template_id}", lambda t=template_id: render_resume(resume, t)))
+    return cases
+
+
+def uncached(render):
+    # A plain Paragraph's output: a bounded LRU of size 0 keeps nothing
+    import layout_cache
+
+    caches = (layout_cache._parsed, layout_cache._layouts)
+    sizes = [cache.maxsize for cache in caches]
+    for cache in caches:
+        cache.maxsize = 0
+        cache.clear()
+    try:
+        return render()
+    finally:
+        for cache, size in zip(caches, sizes):
+            cache.maxsize = size
+
+
+def render_digests():
+    # Runs in the child interpreters started by run()
+    import reproducible
+
+    reproducible.enable(EPOCH)
+    digests = {}
+    unstable = []
+    for name, render in fixtures():
+        renders = [uncached(render)] + [render() for _ in range(RENDERS)]
+        renders = [hashlib.sha256(data).hexdigest() for data in renders]
+        if len(set(renders)) > 1:
+            unstable.append(name)
+        digests[name] = renders[0]
+    return {"environment": environment(), "digests": digests, "unstable": unstable}
+
+
+def run(seed):
+    env = dict(os.environ, PYTHONHASHSEED=seed)
+    env.pop("SOURCE_DATE_EPOCH", None)
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--render"],
+        cwd=SCRIPTS_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode:
+        raise RuntimeError(f"rendering the fixtures failed:\n{proc.stderr}")
+    return json.loads(proc.stdout)
+
+
+def check(update=False):
+    first, second = (run(seed) for seed in HASH_SEEDS)
+    unstable = set(first.pop("unstable")) | set(second.pop("unstable"))
+    failures = [f"{name} differs between uncached and cached renders in one process" for name in sorted(unstable)]
+    failures += [
+        f"{name} differs between runs"
+        for name, digest in first["digests"].items()
+        if second["digests"].get(name) != digest
+    ]
+
+    if update:
+        if not failures:
+            with open(GOLDEN, "w", encoding="utf-8") as f:
+                json.dump(first, f, indent=2, sort_keys=True)
+                f.write("\n")
+            print(f"Recorded {len(first['digests'])} digests in {os.path.basename(GOLDEN)}")
+        return failures
+
+    try:
+        with open(GOLDEN, encoding="utf-8") as f:
+            golden = json.load(f)
+    except FileNotFoundError:
+        golden = None
+    if golden is None or golden["environment"] != first["environment"]:
+        print("note: no golden digests for this environment; only comparing the two runs")
+        golden = {"digests": {}}
+
+    for name, digest in first["digests"].items():
+        expected = golden["digests"].get(name)
+        same = second["digests"].get(name) == digest and name not in unstable
+        ok = same and expected in (None, digest)
+        print(f"{name:<32} {digest[:16]}  {'ok' if ok else 'DIFFERS'}")
+        if expected not in (None, digest):
+            failures.append(f"{name} no longer matches its golden digest")
+    missing = set(golden["digests"]) - set(first["digests"])
+    failures.extend(f"{name} has a golden digest but was not rendered" for name in sorted(missing))
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fail when identical input stops rendering to identical bytes.")
+    parser.add_argument("--update", action="store_true", help="record the current digests as the golden ones")
+    parser.add_argument("--render", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.render:
+        json.dump(render_digests(), sys.stdout)
+        return 0
+
+    failures = check(args.update)
+    for failure in failures:
+        print(f"❌ {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""TrueType fallback fonts for text the standard PDF fonts cannot draw.
+
+Helvetica and the other standard fonts only have glyphs for the WinAnsi
+character set, so emoji headings and non-Latin names come out as blank
+boxes. fallback_markup() wraps each run of characters a paragraph's font
+cannot draw in a ``<font>`` tag naming the first font in FALLBACK_FONTS
+that can, in its bold face where the run is bold. Text the standard fonts cover is returned untouched, so plain
+documents never load a TrueType font at all.
+
+Fonts are looked up by file name on BUILDFOLIO_FONT_PATH (directories
+separated by os.pathsep) and then the usual system font directories. A
+parsed font is kept for the life of the process and reparsed only when its
+file's size or mtime changes. ReportLab embeds just the glyphs a document
+uses; the subset font programs are memoized as well, so documents drawing
+the same characters reuse them instead of rebuilding them.
+"""
+from functools import lru_cache
+import os
+import re
+
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.lib.fonts import addMapping, ps2tt
+
+# (family, regular file, bold file or None), tried in order
+FALLBACK_FONTS = (
+    ("DejaVuSans", "DejaVuSans.ttf", "DejaVuSans-Bold.ttf"),
+    ("NotoSans", "NotoSans-Regular.ttf", "NotoSans-Bold.ttf"),
+    ("NotoSansSymbols2", "NotoSansSymbols2-Regular.ttf", None),
+    ("NotoEmoji", "NotoEmoji-Regular.ttf", "NotoEmoji-Bold.ttf"),
+    ("Symbola", "Symbola.ttf", None),
+)
+
+SYSTEM_FONT_DIRS = (
+    "/usr/share/fonts",
+    "/usr/local/share/fonts",
+    os.path.expanduser("~/.fonts"),
+    os.path.expanduser("~/.local/share/fonts"),
+    "/Library/Fonts",
+    "/System/Library/Fonts",
+    os.path.join(os.environ.get("WINDIR", "C:\\Windows"), "Fonts"),
+)
+
+SUBSET_CACHE_SIZE = 512
+
+# Variation selectors and joiners only pick colour emoji presentation, which
+# PDF fonts do not have; they are dropped rather than drawn as boxes
+INVISIBLE = frozenset("\ufe0e\ufe0f\u200d")
+
+MARKUP_RE = re.compile(r"(<[^>]*>|&#?\w+;)")
+BOLD_TAG_RE = re.compile(r"<(/?)(?:b|strong)\b[^>]*>", re.IGNORECASE)
+
+# Registered fonts by name: ((path, file stamp), TTFont)
+_loaded = {}
+
+
+def font_path():
+    """Directories searched for fallback fonts, in order."""
+    extra = [d for d in os.environ.get("BUILDFOLIO_FONT_PATH", "").split(os.pathsep) if d]
+    return tuple(extra) + SYSTEM_FONT_DIRS
+
+
+@lru_cache(maxsize=8)
+def _index(dirs):
+    # file name -> first path found; walking the font dirs once per process
+    found = {}
+    for top in dirs:
+        for root, _, files in os.walk(top):
+            for name in files:
+                found.setdefault(name, os.path.join(root, name))
+    return found
+
+
+def _stamp(path):
+    st = os.stat(path)
+    return st.st_size, st.st_mtime_ns
+
+
+@lru_cache(maxsize=SUBSET_CACHE_SIZE)
+def _subset(face, stamp, subset):
+    return face._make_subset(list(subset))
+
+
+class CachedTTFont(TTFont):
+    """TTFont whose subset font programs are shared across documents."""
+
+    def __init__(self, name, filename, stamp):
+        TTFont.__init__(self, name, filename)
+        face = self.face
+        face._make_subset = face.makeSubset
+        face.makeSubset = lambda subset: _subset(face, stamp, tuple(subset))
+
+
+def _load(name, path):
+    stamp = _stamp(path)
+    entry = _loaded.get(name)
+    if entry is not None and entry[0] == (path, stamp):
+        return entry[1], False
+    font = CachedTTFont(name, path, stamp)
+    pdfmetrics.registerFont(font)
+    _loaded[name] = ((path, stamp), font)
+    return font, entry is not None
+
+
+def fallback_fonts():
+    """``(family, bold face, glyphs)`` for each fallback font found, in order.
+
+    Registers the fonts, and their bold variants as font families, on first
+    use and again whenever a file changed. The bold face is the family
+    itself for fonts without a bold file.
+    """
+    index = _index(font_path())
+    chain = []
+    reloaded = False
+    for family, regular, bold in FALLBACK_FONTS:
+        if regular not in index:
+            continue
+        font, changed = _load(family, index[regular])
+        reloaded |= changed
+        bold_name = family
+        if bold and bold in index:
+            bold_name = f"{family}-Bold"
+            changed = _load(bold_name, index[bold])[1]
+            reloaded |= changed
+        addMapping(family, 0, 0, family)
+        addMapping(family, 0, 1, family)
+        addMapping(family, 1, 0, bold_name)
+        addMapping(family, 1, 1, bold_name)
+        chain.append((family, bold_name, font.face.charToGlyph))
+    if reloaded:
+        # Paragraphs parsed and laid out with the old metrics are stale
+        from layout_cache import clear_caches
+
+        clear_caches()
+    return chain
+
+
+def fingerprint():
+    """Identity of the fallback fonts available, for output cache keys."""
+    index = _index(font_path())
+    files = [name for entry in FALLBACK_FONTS for name in entry[1:] if name in index]
+    return [[name, *_stamp(index[name])] for name in files]
+
+
+def _covers(font_name):
+    font = pdfmetrics.getFont(font_name)
+    glyphs = getattr(font.face, "charToGlyph", None)
+    if glyphs is not None:
+        return lambda ch: ord(ch) in glyphs
+    encoding = "cp1252" if font.encName == "WinAnsiEncoding" else None
+
+    def covers(ch):
+        try:
+            ch.encode(encoding or "latin-1")
+        except UnicodeEncodeError:
+            return False
+        return True
+    return covers
+
+
+def uses_fallback(text, font_name):
+    """True if fallback_markup() would draw part of ``text`` in a fallback font."""
+    if text.isascii():
+        return False
+    covers = _covers(font_name)
+    missing = {ch for piece in MARKUP_RE.split(text)[::2] for ch in piece if not covers(ch)} - INVISIBLE
+    return bool(missing) and any(ord(ch) in glyphs for _, _, glyphs in fallback_fonts() for ch in missing)
+
+
+def _is_bold(font_name):
+    try:
+        return bool(ps2tt(font_name)[1])
+    except ValueError:
+        # Not registered as part of a font family
+        return False
+
+
+def fallback_markup(text, font_name):
+    """Paragraph markup for ``text`` with fallback fonts where ``font_name`` has no glyph.
+
+    ReportLab takes bold from the face a ``<font>`` tag names, not from the
+    surrounding text, so runs in a bold ``font_name`` or inside ``<b>`` and
+    ``<strong>`` name the fallback's bold face.
+    """
+    if text.isascii():
+        return text
+    covers = _covers(font_name)
+    pieces = MARKUP_RE.split(text)
+    if all(covers(ch) for piece in pieces[::2] for ch in piece):
+        return text
+
+    chain = fallback_fonts()
+    bold = _is_bold(font_name)
+    depth = 0
+    out = []
+    for i, piece in enumerate(pieces):
+        if i % 2:
+            tag = BOLD_TAG_RE.fullmatch(piece)
+            if tag:
+                depth = max(0, depth - 1) if tag.group(1) else depth + 1
+            out.append(piece)
+            continue
+        runs = []
+        for ch in piece:
+            if covers(ch):
+                face = None
+            elif ch in INVISIBLE:
+                continue
+            else:
+                face = next((bold_face if bold or depth else family
+                             for family, bold_face, glyphs in chain if ord(ch) in glyphs), None)
+            if runs and runs[-1][0] == face:
+                runs[-1][1].append(ch)
+            else:
+                runs.append((face, [ch]))
+        for face, chars in runs:
+            run = "".join(chars)
+            out.append(run if face is None else f'<font face="{face}">{run}</font>')
+    return "".join(out)
@@ -0,0 +1,278 @@
+"""Decode-once image pipeline for photos and logos.
+
+Drawing an image the usual way makes ReportLab decode it and, for anything
+but a JPEG, recompress the full-resolution pixels into every document that
+uses it. Batch renders use the same few logos and photos again and again,
+so prepare() does that work once per worker: it decodes the source,
+downscales it to the size it is drawn at (at IMAGE_DPI), and encodes the
+PDF image stream. Photos become a DCT (JPEG) stream; images with
+transparency become a Flate stream plus a soft mask. The prepared streams
+are kept in a memory-bounded LRU keyed by the source's content hash and the
+target pixel size, and ImageFlowable/draw_image add them to each document
+as ready-made image XObjects.
+
+Sources are ``data:`` URLs as sent by the browser, or files under public/
+written as site URLs (such as "/placeholder-logo.png"). Anything that
+resolves outside public/, through "..", an absolute path or a symlink, is
+refused with the same error as a missing file, so form data cannot probe
+or embed the rest of the filesystem.
+"""
+from collections import OrderedDict
+from io import BytesIO
+import base64
+import hashlib
+import os
+import threading
+import zlib
+
+from reportlab.pdfbase import pdfdoc
+from reportlab.platypus.flowables import Flowable
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PUBLIC_DIR = os.path.join(SCRIPTS_DIR, os.pardir, "public")
+
+IMAGE_DPI = 150
+JPEG_QUALITY = 85
+DEFAULT_IMAGE_CACHE_BYTES = 32 * 1024 * 1024
+# Files whose content hash is remembered
+DIGEST_CACHE_SIZE = 1024
+
+
+class ImageError(ValueError):
+    """Raised when an image source cannot be read or decoded."""
+
+
+class PreparedImage:
+    """An encoded PDF image stream, ready to be added to any document."""
+
+    def __init__(self, key, width, height, color_space, filters, stream, smask=None):
+        self.key = key
+        self.width = width
+        self.height = height
+        self.color_space = color_space
+        self.filters = filters
+        self.stream = stream
+        self.smask = smask
+
+    def __len__(self):
+        return len(self.stream) + (len(self.smask) if self.smask else 0)
+
+    def fit(self, width, height):
+        """The size this image is drawn at inside a ``width`` x ``height`` box."""
+        scale = min(width / self.width, height / self.height)
+        return self.width * scale, self.height * scale
+
+    def xobject(self, name):
+        obj = pdfdoc.PDFImageXObject(name)
+        obj.width, obj.height = self.width, self.height
+        obj.bitsPerComponent = 8
+        obj.colorSpace = self.color_space
+        obj._filters = self.filters
+        obj.streamContent = self.stream
+        obj.mask = None
+        return obj
+
+
+class ImageCache:
+    """LRU of prepared images bounded by their total encoded size."""
+
+    def __init__(self, max_bytes=DEFAULT_IMAGE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            image = self._entries.get(key)
+            if image is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return image
+
+    def put(self, key, image):
+        with self._lock:
+            if len(image) > self.max_bytes:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = image
+            self._size += len(image)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.misses = 0
+
+    def info(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._entries), "bytes": self._size}
+
+
+_cache = ImageCache()
+
+# Content hashes of files, by (path, size, mtime), least recently used first
+_digests = OrderedDict()
+_digests_lock = threading.Lock()
+
+
+def image_cache():
+    return _cache
+
+
+def _resolve(source):
+    # The real path of a site URL, or None unless it is a file inside public/
+    root = os.path.realpath(PUBLIC_DIR)
+    path = os.path.realpath(os.path.join(root, source.lstrip("/")))
+    if os.path.commonpath([root, path]) != root or not os.path.isfile(path):
+        return None
+    return path
+
+
+def _file_digest(path, st):
+    stamp = (path, st.st_size, st.st_mtime_ns)
+    with _digests_lock:
+        digest = _digests.get(stamp)
+        if digest is not None:
+            _digests.move_to_end(stamp)
+            return digest
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    with _digests_lock:
+        _digests[stamp] = digest
+        while len(_digests) > DIGEST_CACHE_SIZE:
+            _digests.popitem(last=False)
+    return digest
+
+
+def _read(source):
+    """``(content digest, loader)`` for an image source."""
+    if source.startswith("data:"):
+        try:
+            header, payload = source.split(",", 1)
+            data = base64.b64decode(payload) if header.endswith(";base64") else payload.encode("latin-1")
+        except ValueError as e:
+            raise ImageError(f"invalid data URL: {e}") from None
+        return hashlib.sha256(data).hexdigest(), lambda: data
+
+    path = _resolve(source)
+    try:
+        if path is None:
+            raise OSError
+        st = os.stat(path)
+        digest = _file_digest(path, st)
+    except OSError:
+        # One message whether the file is missing, unreadable or outside public/
+        raise ImageError(f"image not found: {source!r} (expected a data: URL or a file under public/)") from None
+
+    def load():
+        with open(path, "rb") as f:
+            return f.read()
+    return digest, load
+
+
+def source_digest(source):
+    """Content hash of an image source, for output cache keys."""
+    return _read(source)[0]
+
+
+def _encode(key, data, width, height, dpi):
+    from PIL import Image
+
+    try:
+        im = Image.open(BytesIO(data))
+        im.load()
+    except Exception as e:
+        raise ImageError(f"cannot decode image: {e}") from None
+    if im.mode == "P":
+        im = im.convert("RGBA" if "transparency" in im.info else "RGB")
+    elif im.mode not in ("RGB", "RGBA", "L", "LA"):
+        im = im.convert("RGBA" if "A" in im.getbands() else "RGB")
+
+    # Fit the box keeping the aspect ratio; never upscale, so a small logo
+    # stays as sharp as its source allows
+    scale = min(width * dpi / 72 / im.width, height * dpi / 72 / im.height)
+    if scale >= 1 and im.format == "JPEG" and im.mode in ("RGB", "L"):
+        # Already small enough: embed the file as is
+        color_space = "DeviceRGB" if im.mode == "RGB" else "DeviceGray"
+        return PreparedImage(key, im.width, im.height, color_space, ("DCTDecode",), data)
+    if scale < 1:
+        im = im.resize((max(1, round(im.width * scale)), max(1, round(im.height * scale))), Image.LANCZOS)
+
+    alpha = None
+    if im.mode in ("RGBA", "LA"):
+        alpha = im.getchannel("A")
+        if alpha.getextrema() == (255, 255):
+            alpha = None
+        im = im.convert("RGB" if im.mode == "RGBA" else "L")
+    color_space = "DeviceRGB" if im.mode == "RGB" else "DeviceGray"
+
+    if alpha is None:
+        out = BytesIO()
+        im.save(out, "JPEG", quality=JPEG_QUALITY, optimize=True)
+        return PreparedImage(key, im.width, im.height, color_space, ("DCTDecode",), out.getvalue())
+    smask = PreparedImage(f"{key}-mask", im.width, im.height, "DeviceGray", ("FlateDecode",), zlib.compress(alpha.tobytes()))
+    return PreparedImage(key, im.width, im.height, color_space, ("FlateDecode",), zlib.compress(im.tobytes()), smask)
+
+
+def prepare(source, width, height, dpi=IMAGE_DPI, cache=None):
+    """The encoded image for drawing ``source`` inside a ``width`` x ``height`` point box."""
+    cache = _cache if cache is None else cache
+    digest, load = _read(source)
+    key = f"{digest[:32]}-{round(width * dpi / 72)}x{round(height * dpi / 72)}"
+    image = cache.get(key)
+    if image is None:
+        image = _encode(key, load(), width, height, dpi)
+        cache.put(key, image)
+    return image
+
+
+def _register(canv, image):
+    # The first use in a document adds the XObject (and its soft mask)
+    doc = canv._doc
+    name = f"BF{image.key}"
+    reg_name = doc.getXObjectName(name)
+    if reg_name not in doc.idToObject:
+        obj = image.xobject(name)
+        if image.smask is not None:
+            mask_name = f"BF{image.smask.key}"
+            obj.smask = doc.Reference(image.smask.xobject(mask_name), doc.getXObjectName(mask_name))
+        doc.Reference(obj, reg_name)
+        doc.addForm(name, obj)
+    return name, reg_name
+
+
+def draw_image(canv, image, x, y, width, height):
+    """Draw a PreparedImage on ``canv`` stretched to the given size (see ``fit``)."""
+    name, reg_name = _register(canv, image)
+    canv._currentPageHasImages = 1
+    canv.saveState()
+    canv.translate(x, y)
+    canv.scale(width, height)
+    canv._code.append(f"/{reg_name} Do")
+    canv.restoreState()
+    canv._formsinuse.append(name)
+
+
+class ImageFlowable(Flowable):
+    """A photo or logo drawn from the shared image cache, fitted to a box."""
+
+    def __init__(self, source, width, height, dpi=IMAGE_DPI, hAlign="CENTER"):
+        Flowable.__init__(self)
+        self.image = prepare(source, width, height, dpi)
+        self.width, self.height = self.image.fit(width, height)
+        self.hAlign = hAlign
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        draw_image(self.canv, self.image, 0, 0, self.width, self.height)
@@ -0,0 +1,169 @@
+"""Paragraph layout memoization shared across documents in one process.
+
+Most plan text is boilerplate that reappears in every document a worker
+renders. CachedParagraph memoizes the two expensive steps of a ReportLab
+Paragraph: markup parsing (keyed by text and style) and line breaking
+(keyed by text, style and available width). Both caches are bounded LRUs.
+
+ReportLab's split and draw code edit fragments and line lists in place (a
+split appends spaces to the last word of each line, for one), so the caches
+hold private copies: every hit gets fresh fragments and line breaks, and
+output stays byte-identical to a plain Paragraph however often a text is
+rendered.
+
+Text the style's font has no glyphs for is routed to TrueType fallback fonts
+(see fonts.py) while parsing, so the rewrite is cached along with the parse.
+
+Keys hold the style object itself, so styles must not be mutated after use;
+the shared styles from style_registry are frozen for exactly this reason.
+"""
+from collections import OrderedDict
+import threading
+
+from reportlab.lib.abag import ABag
+from reportlab.platypus import Paragraph
+
+from fonts import fallback_markup
+
+PARSE_CACHE_SIZE = 4096
+LAYOUT_CACHE_SIZE = 8192
+
+
+class _LRU:
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def info(self):
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data), "maxsize": self.maxsize}
+
+
+_parsed = _LRU(PARSE_CACHE_SIZE)
+_layouts = _LRU(LAYOUT_CACHE_SIZE)
+
+
+# What Paragraph.wrap leaves on the instance; breakLines also replaces
+# ``frags`` with the processed word list that split() slices
+_WRAP_STATE = ("frags", "blPara", "_wrapWidths", "width", "height", "_width_max", "_hyphenations", "_splitLongWordCount")
+
+
+def _clone(frag, memo):
+    # One clone per fragment, so fragments shared between words stay shared
+    copy = memo.get(id(frag))
+    if copy is None:
+        copy = memo[id(frag)] = frag.clone()
+    return copy
+
+
+def _copy_frags(frags, memo):
+    # Fragments are attribute bags whose edits replace attributes (mostly
+    # ``text``), so a shallow clone of each is a private copy. Processed
+    # frags are words, lists of a width and (fragment, text) pairs whose
+    # class split() may change in place
+    out = []
+    for frag in frags:
+        if isinstance(frag, list):
+            word = type(frag)(frag[:1] + [(_clone(f, memo), t) for f, t in frag[1:]])
+            if type(frag) is not list:
+                word.__dict__.update(frag.__dict__)
+            out.append(word)
+        else:
+            out.append(_clone(frag, memo))
+    return out
+
+
+def _copy_lines(blPara, memo):
+    # Simple paragraphs break into (extra space, [words]) tuples, styled ones
+    # into FragLines of word fragments
+    lines = []
+    for line in blPara.lines:
+        if isinstance(line, ABag):
+            line = line.clone(words=_copy_frags(line.words, memo))
+        else:
+            line = tuple(list(item) if isinstance(item, list) else item for item in line)
+        lines.append(line)
+    return blPara.clone(lines=lines)
+
+
+def _copy_state(state):
+    memo = {}
+    state = dict(state)
+    state["frags"] = _copy_frags(state["frags"], memo)
+    state["blPara"] = _copy_lines(state["blPara"], memo)
+    state["_wrapWidths"] = list(state["_wrapWidths"])
+    return state
+
+
+def cache_info():
+    return {"parse": _parsed.info(), "layout": _layouts.info()}
+
+
+def clear_caches():
+    _parsed.clear()
+    _layouts.clear()
+
+
+class CachedParagraph(Paragraph):
+    """Paragraph that reuses parsed fragments and line breaks across instances."""
+
+    def _setup(self, text, style, bulletText, frags, cleaner):
+        # Paragraphs created from pre-split fragments (the halves produced by
+        # split()) carry no text and are not cached
+        if frags is not None:
+            self._layout_key = None
+            return Paragraph._setup(self, text, style, bulletText, frags, cleaner)
+
+        key = (text, style, bulletText, self.caseSensitive)
+        parsed = _parsed.get(key)
+        if parsed is None:
+            Paragraph._setup(self, fallback_markup(text, style.fontName), style, bulletText, frags, cleaner)
+            # Keep the caller's text (outline entries use it), not the markup
+            self.text = text
+            _parsed.put(key, (self.text, _copy_frags(self.frags, {}), self.style, self.bulletText))
+        else:
+            self.text, frags, self.style, self.bulletText = parsed
+            self.frags = _copy_frags(frags, {})
+            self.debug = 0
+        self._layout_key = key
+
+    def wrap(self, availWidth, availHeight):
+        if self._layout_key is None or getattr(self, "autoLeading", None) is not None:
+            return Paragraph.wrap(self, availWidth, availHeight)
+
+        key = self._layout_key + (availWidth,)
+        layout = _layouts.get(key)
+        if layout is None:
+            width, height = Paragraph.wrap(self, availWidth, availHeight)
+            # Paragraph.wrap bails out with a huge height when nothing fits
+            if height < 0x7fffffff:
+                state = {name: getattr(self, name) for name in _WRAP_STATE if hasattr(self, name)}
+                _layouts.put(key, _copy_state(state))
+            return width, height
+
+        self.__dict__.update(_copy_state(layout))
+        return self.width, self.height
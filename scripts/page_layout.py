@@ -0,0 +1,243 @@
+"""Layout-only page breaking for live previews.
+
+A preview needs the page count and where the pages break while the user
+types, and a full build answers that by also drawing every page and writing
+the PDF. PageLayout runs just the wrap/split steps of SimpleDocTemplate's
+single-frame layout against an empty frame and records where each page's
+content starts, without drawing or serializing anything.
+
+layout_sections() lays a document out one section at a time and caches each
+section's outcome under the hash of the input it is built from plus the
+layout state it starts in (position on the page and pending space). After
+an edit, the sections before the edited one come straight from the cache,
+without even building their flowables; later sections are laid out again
+only while their starting position differs from the previous run.
+"""
+from collections import deque
+from io import BytesIO
+import hashlib
+import json
+
+from reportlab import rl_config
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import PageBreak
+from reportlab.platypus.doctemplate import ActionFlowable, NullActionFlowable, _FrameBreak
+from reportlab.platypus.frames import Frame
+
+from layout_cache import _LRU
+
+SECTION_CACHE_SIZE = 4096
+
+# Section outcomes keyed by (document key, section digest, start state)
+_sections = _LRU(SECTION_CACHE_SIZE)
+
+
+class LayoutUnsupported(RuntimeError):
+    """Raised when a story does something the dry layout does not model."""
+
+
+def section_digest(content):
+    """Hash of the JSON-serializable input a section is built from."""
+    payload = json.dumps(content, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _place(frame, flowable, canv):
+    # Frame._add without the drawing: advance the frame and return the
+    # flowable's height if it fits, None otherwise
+    y, bottom = frame._y, frame._y1p
+    space = 0
+    if not frame._atTop:
+        space = flowable.getSpaceBefore()
+        if frame._oASpace:
+            space = max(space - frame._prevASpace, 0)
+    available = y - bottom - space
+    if available <= 0:
+        return None
+    flowable.canv = canv
+    try:
+        _, height = flowable.wrap(frame._getAvailableWidth(), available)
+    finally:
+        del flowable.canv
+    y -= height + space
+    if y < bottom - rl_config._FUZZ:
+        return None
+    after = flowable.getSpaceAfter()
+    y -= after
+    if frame._oASpace:
+        frame._prevASpace = after
+    if y != frame._y:
+        frame._atTop = 0
+    frame._y = y
+    return height
+
+
+def _breaks_around(flowable):
+    # keepWithNext and break-before styles regroup the story in the doc template
+    style = getattr(flowable, "style", None)
+    return bool(
+        flowable.getKeepWithNext()
+        or getattr(style, "pageBreakBefore", 0)
+        or getattr(style, "frameBreakBefore", 0)
+    )
+
+
+class PageLayout:
+    """Dry run of SimpleDocTemplate's single-frame layout.
+
+    ``starts`` records where every page's content begins, as ``(page,
+    section, index, offset)``: ``index`` counts the flowables given to add()
+    for ``section`` and ``offset`` is how many points of that flowable went
+    on earlier pages (non-zero when a flowable is split across pages).
+    """
+
+    def __init__(self, doc):
+        self.frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height)
+        self.canv = Canvas(BytesIO(), pagesize=doc.pagesize)
+        # KeepTogether asks the doc template about the next frame when splitting
+        self.canv._doctemplate = self
+        self.page = 1
+        self.blank = True
+        self.starts = []
+
+    def _peekNextFrame(self):
+        return self.frame
+
+    @property
+    def page_count(self):
+        # A trailing page break does not start another page
+        return self.page - 1 if self.blank and self.page > 1 else self.page
+
+    def state(self):
+        """Where the next flowable goes, apart from the page number."""
+        frame = self.frame
+        return frame._y, frame._atTop, frame._prevASpace, self.blank
+
+    def restore(self, page, state):
+        frame = self.frame
+        self.page = page
+        frame._y, frame._atTop, frame._prevASpace, self.blank = state
+
+    def afterFlowable(self, flowable):
+        """Called for every flowable placed, like BaseDocTemplate.afterFlowable."""
+
+    def _new_page(self):
+        self.page += 1
+        self.blank = True
+        self.frame._reset()
+
+    def add(self, flowables, section=None):
+        """Lay ``flowables`` out from the current position.
+
+        Returns the first and last page holding any of them, or None when
+        they put nothing on a page. Raises LayoutUnsupported for action
+        flowables other than page and frame breaks, keepWithNext and
+        break-before styles, and flowables too large for an empty page.
+        """
+        source = enumerate(flowables)
+        pending = deque()
+        # Points of each split flowable placed so far
+        placed = {}
+        first = last = None
+        while True:
+            if pending:
+                index, flowable = pending.popleft()
+            else:
+                index, flowable = next(source, (None, None))
+                if flowable is None:
+                    return (first, last) if first is not None else None
+            if isinstance(flowable, (PageBreak, _FrameBreak)):
+                self._new_page()
+                continue
+            if isinstance(flowable, NullActionFlowable):
+                continue
+            if isinstance(flowable, ActionFlowable) or _breaks_around(flowable):
+                raise LayoutUnsupported(f"{type(flowable).__name__} needs a full build")
+
+            height = _place(self.frame, flowable, self.canv)
+            if height is None:
+                pieces = self.frame.split(flowable, self.canv)
+                if not pieces:
+                    if self.frame._atTop:
+                        raise LayoutUnsupported(f"{type(flowable).__name__} is too large for an empty page")
+                    self._new_page()
+                    pending.appendleft((index, flowable))
+                    continue
+                pending.extendleft((index, piece) for piece in reversed(pieces))
+                if isinstance(pieces[0], (PageBreak, ActionFlowable)):
+                    # KeepTogether: a break (or none) and then its content
+                    continue
+                index, flowable = pending.popleft()
+                height = _place(self.frame, flowable, self.canv)
+                if height is None:
+                    raise LayoutUnsupported(f"{type(flowable).__name__} does not fit after splitting")
+
+            if self.blank:
+                self.starts.append((self.page, section, index, placed.get(index, 0)))
+                self.blank = False
+            placed[index] = placed.get(index, 0) + height
+            first = self.page if first is None else first
+            last = self.page
+            self.afterFlowable(flowable)
+
+
+def layout_sections(doc, sections, key=None):
+    """Page count, section page ranges and page breaks of a document.
+
+    ``doc`` supplies the page geometry and ``sections`` yields ``(title,
+    content, build)`` in story order: ``content`` is the JSON-serializable
+    input the section is built from and ``build()`` returns its flowables,
+    called only when the section is not cached. ``key`` identifies
+    everything else the layout depends on, such as the template.
+    """
+    layout = PageLayout(doc)
+    doc_key = (key, tuple(doc.pagesize), doc.leftMargin, doc.bottomMargin, doc.width, doc.height)
+    ranges = []
+    laid_out = 0
+    for number, (title, content, build) in enumerate(sections):
+        start_page, start = layout.page, layout.state()
+        cache_key = (doc_key, section_digest(content), start)
+        entry = _sections.get(cache_key)
+        if entry is None:
+            laid_out += 1
+            known = len(layout.starts)
+            pages = layout.add(build(), number)
+            # Stored relative to the start page, so a section that starts in
+            # the same place on a later page still hits
+            entry = (
+                layout.page - start_page,
+                layout.state(),
+                pages and (pages[0] - start_page, pages[1] - start_page),
+                [(page - start_page, index, offset) for page, _, index, offset in layout.starts[known:]],
+            )
+            _sections.put(cache_key, entry)
+        else:
+            advance, state, pages, starts = entry
+            layout.restore(start_page + advance, state)
+            layout.starts.extend((start_page + page, number, index, offset) for page, index, offset in starts)
+        pages = entry[2]
+        ranges.append({
+            "title": title,
+            "first_page": start_page + pages[0] if pages else None,
+            "last_page": start_page + pages[1] if pages else None,
+        })
+
+    return {
+        "pages": layout.page_count,
+        "sections": ranges,
+        "breaks": [
+            {"page": page, "section": section, "flowable": index, "offset": round(offset, 2)}
+            for page, section, index, offset in layout.starts
+            if page > 1
+        ],
+        "laid_out": laid_out,
+        "cached": len(ranges) - laid_out,
+    }
+
+
+def cache_info():
+    return _sections.info()
+
+
+def clear_cache():
+    _sections.clear()
@@ -0,0 +1,42 @@
+"""Output targets for rendered PDFs.
+
+Renderers take any writable binary stream (a file, BytesIO, pipe or socket)
+or hand back a memoryview over an in-memory buffer, so callers that stream
+PDFs into HTTP responses or object-store uploads never touch the disk.
+"""
+from io import BytesIO
+
+
+class _SocketWriter:
+    # Sockets have sendall() instead of write()
+    def __init__(self, sock):
+        self.sock = sock
+
+    def write(self, data):
+        self.sock.sendall(data)
+        return len(data)
+
+
+def writable(output):
+    """Return a file-like object with ``write()`` for ``output``."""
+    if callable(getattr(output, "write", None)):
+        return output
+    if callable(getattr(output, "sendall", None)):
+        return _SocketWriter(output)
+    raise TypeError(f"cannot write a PDF to {type(output).__name__}")
+
+
+def render_to(output, build):
+    """Call ``build(stream)`` with a writable view of ``output``; returns ``output``."""
+    build(writable(output))
+    return output
+
+
+def render_view(build):
+    """Call ``build(stream)`` on an in-memory buffer and return a memoryview of it.
+
+    The view shares the buffer's memory, so no copy of the PDF is made.
+    """
+    buffer = BytesIO()
+    build(buffer)
+    return buffer.getbuffer()
@@ -0,0 +1,241 @@
+"""Password protection for rendered PDFs.
+
+Documents are encrypted with the PDF standard security handler, on top of
+ReportLab's StandardEncryption: AES-256 (revision 6, ISO 32000-2, the
+default) or, for old readers, RC4 with a 128-bit key (revision 3).
+Passwords and permission flags are set per document, from an options dict
+such as a batch record's ``"encrypt"`` entry::
+
+    {"user_password": "...", "owner_password": "...",
+     "permissions": ["print", "copy"], "strength": 256}
+
+ReportLab's own RC4 is pure Python and runs byte by byte, in the key setup
+as much as on the content, which makes a small encrypted document twice as
+slow to render as a plain one. When the ``cryptography`` package is
+installed, FastEncryption runs the same RC4 through OpenSSL instead and
+produces the same output. AES-256 always goes through ``cryptography``:
+ReportLab's version needs pyaes and only writes revision 5, a deprecated
+Adobe extension whose unsalted password hash is cheap to brute-force.
+Revision 6 documents get a PDF 2.0 header, the version that defines it.
+
+The revision 6 password hash is deliberately slow, and wrapping the file
+key for both passwords runs it four times, which alone costs about as
+much as rendering a small document. The wrapped keys are kept per
+passwords and permissions for the life of the process, so documents
+sharing them share one file key (each string and stream still gets its
+own random IV), and only the first pays for the hashing.
+"""
+from functools import lru_cache
+from hashlib import md5, sha256, sha384, sha512
+import os
+
+from reportlab.lib.pdfencrypt import PadString, StandardEncryption, StandardEncryptionDictionary, encryptionkey, hexText, xorKey
+
+PERMISSIONS = ("print", "modify", "copy", "annotate")
+STRENGTHS = (128, 256)
+DEFAULT_STRENGTH = 256
+KEY_CACHE_SIZE = 256
+
+
+@lru_cache(maxsize=None)
+def _ciphers():
+    # cryptography is imported on first use; None when it is not installed
+    try:
+        from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+    except ImportError:
+        return None
+    try:
+        from cryptography.hazmat.decrepit.ciphers.algorithms import ARC4
+    except ImportError:
+        ARC4 = algorithms.ARC4
+    return Cipher, algorithms.AES, ARC4, modes
+
+
+def _rc4(key, data):
+    Cipher, _, ARC4, _ = _ciphers()
+    return Cipher(ARC4(key), mode=None).encryptor().update(data)
+
+
+def _aes(key, data, mode):
+    # AES without padding; data is a whole number of blocks
+    Cipher, AES, _, _ = _ciphers()
+    encryptor = Cipher(AES(key), mode).encryptor()
+    return encryptor.update(data) + encryptor.finalize()
+
+
+def _pad(password):
+    return (password.encode("utf-8") + PadString)[:32]
+
+
+def _hash_r6(password, salt, udata=b""):
+    # ISO 32000-2, algorithm 2.B: at least 64 rounds of AES-128 and SHA-2
+    _, _, _, modes = _ciphers()
+    k = sha256(password + salt + udata).digest()
+    rounds = 0
+    while True:
+        e = _aes(k[:16], (password + k + udata) * 64, modes.CBC(k[16:32]))
+        k = (sha256, sha384, sha512)[int.from_bytes(e[:16], "big") % 3](e).digest()
+        rounds += 1
+        if rounds >= 64 and e[-1] <= rounds - 32:
+            return k[:32]
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def _aes_keys(user, owner, p):
+    # Random file key wrapped for each password (ISO 32000-2, algorithms
+    # 8 to 10, hashing with algorithm 2.B): (key, U, UE, O, OE, Perms)
+    _, _, _, modes = _ciphers()
+    zero_iv = modes.CBC(bytes(16))
+    key = os.urandom(32)
+    user = user.encode("utf-8")[:127]
+    owner = owner.encode("utf-8")[:127]
+    salts = os.urandom(16)
+    u = _hash_r6(user, salts[:8]) + salts
+    ue = _aes(_hash_r6(user, salts[8:]), key, zero_iv)
+    salts = os.urandom(16)
+    o = _hash_r6(owner, salts[:8], u) + salts
+    oe = _aes(_hash_r6(owner, salts[8:], u), key, zero_iv)
+    perms = (p & 0xFFFFFFFF).to_bytes(4, "little") + b"\xff\xff\xff\xffTadb" + os.urandom(4)
+    return key, u, ue, o, oe, _aes(key, perms, modes.ECB())
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def _generated_owner(user):
+    # Nobody ever learns a generated owner password, so one per user
+    # password serves as well as one per document and keeps _aes_keys hits
+    return os.urandom(16).hex()
+
+
+class _AESDictionary(StandardEncryptionDictionary):
+    # ReportLab only writes revisions 2, 3 and 5
+    def format(self, document):
+        from reportlab.pdfbase.pdfdoc import DummyDoc, PDFDictionary, PDFName
+
+        filter_ = PDFDictionary({"Length": 32, "AuthEvent": PDFName("DocOpen"), "CFM": PDFName("AESV3")})
+        entries = {
+            "Filter": PDFName("Standard"),
+            "V": 5,
+            "R": 6,
+            "Length": 256,
+            "O": hexText(self.O),
+            "U": hexText(self.U),
+            "OE": hexText(self.OE),
+            "UE": hexText(self.UE),
+            "P": self.P,
+            "Perms": hexText(self.Perms),
+            "CF": PDFDictionary({"StdCF": filter_}),
+            "StmF": PDFName("StdCF"),
+            "StrF": PDFName("StdCF"),
+        }
+        # A dummy document keeps the dictionary itself unencrypted
+        return PDFDictionary(entries).format(DummyDoc())
+
+
+class EncryptionOptionsError(ValueError):
+    """Raised when a document's encryption options are malformed."""
+
+
+class FastEncryption(StandardEncryption):
+    """StandardEncryption that encrypts through OpenSSL when it can."""
+
+    def __init__(self, userPassword, ownerPassword=None, canPrint=1, canModify=1, canCopy=1, canAnnotate=1, strength=DEFAULT_STRENGTH):
+        if strength == 256 and _ciphers() is None:
+            raise ValueError("strength 256 needs the cryptography package (or ask for strength 128)")
+        StandardEncryption.__init__(
+            self, userPassword, ownerPassword, canPrint, canModify, canCopy, canAnnotate,
+            strength=128 if strength == 256 else strength,
+        )
+        if strength == 256:
+            self.revision = 6
+
+    def prepare(self, document, overrideID=None):
+        if self.revision == 6:
+            document._pdfVersion = max(document._pdfVersion, (2, 0))
+        if self.prepared or (self.revision == 3 and _ciphers() is None):
+            return StandardEncryption.prepare(self, document, overrideID)
+        self.P = int(self.permissionBits() - 2**31)
+        if self.revision == 6:
+            self.key, self.U, self.UE, self.O, self.OE, self.Perms = _aes_keys(self.userPassword, self.ownerPassword, self.P)
+        else:
+            if overrideID:
+                document_id = overrideID
+            else:
+                document.ID()
+                document_id = document.signature.digest()
+            self._prepare_rc4(document_id)
+        self.objnum = self.version = None
+        self.prepared = 1
+
+    def _prepare_rc4(self, document_id):
+        # Owner key, file key and user key (PDF 1.7, algorithms 3, 2 and 5);
+        # ReportLab runs RC4 forty times here, most of a small document's cost
+        digest = md5(_pad(self.ownerPassword)).digest()
+        for _ in range(50):
+            digest = md5(digest).digest()
+        self.O = _pad(self.userPassword)
+        for i in range(20):
+            self.O = _rc4(xorKey(i, digest), self.O)
+        self.key = encryptionkey(self.userPassword, self.O, self.P, document_id, revision=3)
+        u = md5(PadString + document_id).digest()
+        for i in range(20):
+            u = _rc4(xorKey(i, self.key), u)
+        self.U = u + bytes(16)
+
+    def info(self):
+        if self.revision != 6:
+            return StandardEncryption.info(self)
+        if not self.prepared:
+            raise ValueError("encryption not prepared!")
+        return _AESDictionary(self.O, self.OE, self.U, self.UE, self.P, self.Perms, self.revision)
+
+    def encode(self, t):
+        if _ciphers() is None or not self.prepared or self.objnum is None:
+            return StandardEncryption.encode(self, t)
+        if isinstance(t, str):
+            t = t.encode("utf-8")
+        if self.revision == 6:
+            # AES-256-CBC with a random IV and PKCS#7 padding
+            _, _, _, modes = _ciphers()
+            iv = os.urandom(16)
+            pad = 16 - len(t) % 16
+            return iv + _aes(self.key, t + bytes([pad]) * pad, modes.CBC(iv))
+        # RC4 keyed per object (PDF 1.7, algorithm 1)
+        key = self.key + self.objnum.to_bytes(3, "little") + self.version.to_bytes(2, "little")
+        return _rc4(md5(key).digest()[:min(len(self.key) + 5, 16)], t)
+
+
+def encryption(options):
+    """Build the encryption for ``doc.encrypt`` from an options dict, or None."""
+    if not options:
+        return None
+    if not isinstance(options, dict):
+        raise EncryptionOptionsError("encrypt: expected an object")
+    user = options.get("user_password", "")
+    owner = options.get("owner_password") or None
+    if not isinstance(user, str) or (owner is not None and not isinstance(owner, str)):
+        raise EncryptionOptionsError("encrypt: passwords must be strings")
+    if not user and not owner:
+        raise EncryptionOptionsError("encrypt: needs a user_password or an owner_password")
+
+    permissions = options.get("permissions", list(PERMISSIONS))
+    if not isinstance(permissions, list) or not set(permissions) <= set(PERMISSIONS):
+        raise EncryptionOptionsError(f"encrypt.permissions: expected a list of {', '.join(PERMISSIONS)}")
+    strength = options.get("strength", DEFAULT_STRENGTH)
+    if strength not in STRENGTHS:
+        raise EncryptionOptionsError(f"encrypt.strength: must be one of {', '.join(map(str, STRENGTHS))}")
+
+    try:
+        return FastEncryption(
+            user,
+            # Without an owner password nobody could lift the restrictions,
+            # so generate one rather than reuse the user password
+            owner or _generated_owner(user),
+            canPrint="print" in permissions,
+            canModify="modify" in permissions,
+            canCopy="copy" in permissions,
+            canAnnotate="annotate" in permissions,
+            strength=strength,
+        )
+    except ValueError as e:
+        # AES-256 without cryptography installed
+        raise EncryptionOptionsError(f"encrypt.strength: {e}") from None
@@ -0,0 +1,74 @@
+"""Stitch pages rendered by separate ReportLab canvases into one PDF.
+
+A page's content stream can be replayed onto another canvas as long as both
+canvases give their fonts the same internal names and the page refers to no
+other document-level objects (images, forms, link annotations, shadings,
+transparency states or TrueType font subsets). CaptureCanvas records each finished page as its list
+of content stream operators instead of writing a PDF, so a worker process
+can hand pages back as plain strings. StitchCanvas appends recorded pages
+after whatever was drawn on it natively and writes the single output file.
+
+Both canvases register STANDARD_FONTS up front so the Helvetica family maps
+to the same ``/F`` names everywhere. A captured chunk also carries its full
+font mapping; StitchCanvas adopts it or raises StitchError, and callers fall
+back to a serial build.
+"""
+from reportlab.pdfgen.canvas import Canvas
+
+STANDARD_FONTS = ("Helvetica", "Helvetica-Bold", "Helvetica-Oblique", "Helvetica-BoldOblique")
+
+
+class StitchError(RuntimeError):
+    """Raised when captured pages cannot be replayed onto another canvas."""
+
+
+def _register_fonts(canv):
+    for name in STANDARD_FONTS:
+        canv._doc.getInternalFontName(name)
+
+
+class CaptureCanvas(Canvas):
+    """Canvas that records finished pages instead of writing a PDF."""
+
+    def __init__(self, *args, **kwargs):
+        Canvas.__init__(self, *args, **kwargs)
+        _register_fonts(self)
+        self.pages = []
+
+    def showPage(self):
+        if (self._annotationrefs or self._formsinuse or self._shadingUsed or self._extgstate.getState()
+                or self._doc.delayedFonts):
+            raise StitchError(f"page {self._pageNumber} uses document-level resources")
+        self.pages.append((list(self._code), dict(self._colorsUsed)))
+        self._startPage()
+
+    def save(self):
+        pass
+
+    def fonts(self):
+        """The ``{font name: internal name}`` mapping the captured pages rely on."""
+        return dict(self._doc.fontMapping)
+
+
+class StitchCanvas(Canvas):
+    """Canvas that can append pages recorded by a CaptureCanvas."""
+
+    def __init__(self, *args, **kwargs):
+        Canvas.__init__(self, *args, **kwargs)
+        _register_fonts(self)
+
+    def adopt_fonts(self, fonts):
+        # Register in the capturing canvas's order so new fonts get its names
+        for name, internal in sorted(fonts.items(), key=lambda item: int(item[1].lstrip("/F"))):
+            if self._doc.getInternalFontName(name) != internal:
+                raise StitchError(f"font {name} is {internal} in the captured pages")
+
+    def append_page(self, code, colors=None, bookmarks=()):
+        """Emit one captured page; ``bookmarks`` are ``(key, title, top)`` outline entries on it."""
+        for key, title, top in bookmarks:
+            self.bookmarkPage(key, fit="XYZ", top=top)
+            self.addOutlineEntry(title, key, 0)
+        self._code.extend(code)
+        if colors:
+            self._colorsUsed.update(colors)
+        self.showPage()
@@ -0,0 +1,333 @@
+"""Declarative project plan specs.
+
+A plan spec is a JSON (or YAML, when PyYAML is installed) document that lists
+the sections of a plan: free-form sections with bullet groups, phases made of
+steps and tasks with hour estimates, and the timeline table. Phase ranges,
+totals and the critical path are derived from task hours and phase
+dependencies by schedule.py, so the printed numbers cannot drift. A top-level
+``"toc": true`` (or ``{"title": "..."}``) adds a table of contents of the
+top-level headings to the title page. compile_plan()
+validates a spec and lowers it to a flat list of layout blocks which
+generate_project_plan.py turns into ReportLab flowables.
+
+Compiled models are cached on disk under a content hash of the raw spec, so
+an unchanged spec skips parsing and validation on later runs.
+"""
+import hashlib
+import json
+import os
+
+from schedule import summarize
+
+# Bump whenever the compiled block format changes so stale caches are ignored
+COMPILER_VERSION = 4
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SPEC = os.path.join(SCRIPTS_DIR, "project_plan.json")
+CACHE_DIR = os.environ.get(
+    "BUILDFOLIO_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "buildfolio"),
+)
+
+SECTION_TYPES = ("section", "phase", "timeline")
+BREAK_TYPES = (None, "page", "spacer")
+DEFAULT_SPACER = 0.2
+DEFAULT_TOC_TITLE = "Contents"
+
+# Compiled models already seen by this process, keyed by spec hash. Bounded
+# so long-running batch workers do not grow without limit.
+MEMO_SIZE = 256
+_compiled = {}
+
+
+class PlanSpecError(ValueError):
+    """Raised when a plan spec is malformed."""
+
+
+def spec_hash(raw):
+    """Content hash of a raw spec, salted with the compiler version."""
+    digest = hashlib.sha256(f"plan-compiler:{COMPILER_VERSION}\n".encode())
+    digest.update(raw)
+    return digest.hexdigest()
+
+
+def format_estimate(low, high, unit="hours"):
+    if low == high:
+        return f"{low:g} {unit}"
+    return f"{low:g}-{high:g} {unit}"
+
+
+def parse_spec(raw, fmt="json"):
+    if fmt == "yaml":
+        # Imported on demand: PyYAML is optional and slow to import
+        try:
+            import yaml
+        except ImportError:
+            raise PlanSpecError("PyYAML is required to read YAML plan specs") from None
+        try:
+            return yaml.safe_load(raw)
+        except yaml.YAMLError as e:
+            raise PlanSpecError(f"invalid YAML plan spec: {e}") from e
+    try:
+        return json.loads(raw)
+    except ValueError as e:
+        raise PlanSpecError(f"invalid JSON plan spec: {e}") from e
+
+
+def _require(obj, key, kind, where):
+    if not isinstance(obj, dict):
+        raise PlanSpecError(f"{where}: expected an object")
+    if key not in obj:
+        raise PlanSpecError(f"{where}: missing '{key}'")
+    value = obj[key]
+    if not isinstance(value, kind):
+        raise PlanSpecError(f"{where}.{key}: expected {kind.__name__}")
+    return value
+
+
+def _optional(obj, key, kind, where, default):
+    # Missing and null both mean the default
+    value = obj.get(key)
+    if value is None:
+        return default
+    if not isinstance(value, kind):
+        raise PlanSpecError(f"{where}.{key}: expected {kind.__name__}")
+    return value
+
+
+def _step_tasks(step, where):
+    if not isinstance(step, dict):
+        raise PlanSpecError(f"{where}: expected an object")
+    return _optional(step, "tasks", list, where, [])
+
+
+def _strings(values, where):
+    if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+        raise PlanSpecError(f"{where}: expected a list of strings")
+    return values
+
+
+def _task_text(task, where):
+    # Tasks are plain strings or {"text": ..., "hours": [min, max]}
+    if isinstance(task, str):
+        return task
+    if isinstance(task, dict):
+        return _require(task, "text", str, where)
+    raise PlanSpecError(f"{where}: expected a string or an object")
+
+
+def _range(value, where):
+    if isinstance(value, dict):
+        value = [value.get("min"), value.get("max")]
+    if (not isinstance(value, list) or len(value) != 2
+            or not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in value)
+            or value[0] > value[1]):
+        raise PlanSpecError(f"{where}: expected numeric min <= max")
+    return list(value)
+
+
+def _phase_schedule(section, where, ids):
+    # Task hours when the tasks carry them, else the phase's own estimate;
+    # a phase estimate given alongside task hours must agree with them
+    tasks = []
+    for j, step in enumerate(_require(section, "steps", list, where)):
+        for k, task in enumerate(_step_tasks(step, f"{where}.steps[{j}]")):
+            if isinstance(task, dict) and "hours" in task:
+                tasks.append(_range(task["hours"], f"{where}.steps[{j}].tasks[{k}].hours"))
+    if "estimate" in section:
+        estimate = _range(section["estimate"], f"{where}.estimate")
+        if tasks and estimate != [sum(t[0] for t in tasks), sum(t[1] for t in tasks)]:
+            raise PlanSpecError(f"{where}.estimate: does not match the sum of its task hours")
+        tasks = tasks or [estimate]
+    elif not tasks:
+        raise PlanSpecError(f"{where}: missing 'estimate' (or task hours)")
+
+    # Phases run one after another unless depends_on says otherwise
+    if "depends_on" in section:
+        depends_on = []
+        for dep in _strings(section["depends_on"], f"{where}.depends_on"):
+            if dep not in ids:
+                raise PlanSpecError(f"{where}.depends_on: '{dep}' is not the id of an earlier phase")
+            depends_on.append(ids[dep])
+    else:
+        depends_on = [len(ids) - 1] if ids else []
+    return {"tasks": tasks, "depends_on": depends_on}
+
+
+def _toc_title(spec):
+    toc = spec.get("toc")
+    if toc is None or toc is False:
+        return None
+    if toc is True:
+        return DEFAULT_TOC_TITLE
+    if isinstance(toc, dict):
+        return _optional(toc, "title", str, "spec.toc", "") or DEFAULT_TOC_TITLE
+    raise PlanSpecError("spec.toc: expected a boolean or an object")
+
+
+def compile_plan(spec):
+    """Validate a parsed spec and lower it to the intermediate block model."""
+    if not isinstance(spec, dict):
+        raise PlanSpecError("plan spec must be an object")
+    title = _require(spec, "title", str, "spec")
+    subtitle = _optional(spec, "subtitle", str, "spec", "")
+    sections = _require(spec, "sections", list, "spec")
+    toc = _toc_title(spec)
+
+    phases = []
+    phase_wheres = []
+    schedule = []
+    ids = {}
+    for i, section in enumerate(sections):
+        where = f"sections[{i}]"
+        if not isinstance(section, dict):
+            raise PlanSpecError(f"{where}: expected an object")
+        if section.get("type", "section") not in SECTION_TYPES:
+            raise PlanSpecError(f"{where}.type: must be one of {', '.join(SECTION_TYPES)}")
+        if section.get("break_after") not in BREAK_TYPES:
+            raise PlanSpecError(f"{where}.break_after: must be 'page', 'spacer' or null")
+        if section.get("type") == "phase":
+            phase_id = section.get("id", f"phase-{len(phases) + 1}")
+            if not isinstance(phase_id, str) or phase_id in ids:
+                raise PlanSpecError(f"{where}.id: expected a unique string")
+            schedule.append(_phase_schedule(section, where, ids))
+            ids[phase_id] = len(phases)
+            phases.append(section)
+            phase_wheres.append(where)
+
+    summary = summarize(schedule)
+    estimates = iter(summary["phases"])
+    total_estimate = format_estimate(*summary["total"])
+    critical_estimate = format_estimate(*summary["critical_path"])
+
+    blocks = []
+    for i, section in enumerate(sections):
+        where = f"sections[{i}]"
+        kind = section.get("type", "section")
+
+        if kind == "phase":
+            blocks.append(("heading1", _require(section, "title", str, where)))
+            for j, step in enumerate(_require(section, "steps", list, where)):
+                step_where = f"{where}.steps[{j}]"
+                blocks.append(("heading2", _require(step, "title", str, step_where)))
+                step_summary = _optional(step, "summary", str, step_where, "")
+                if step_summary:
+                    blocks.append(("body", step_summary))
+                for k, task in enumerate(_step_tasks(step, step_where)):
+                    blocks.append(("bullet", _task_text(task, f"{step_where}.tasks[{k}]")))
+            blocks.append(("body", f"⏱️ Estimated Time: {format_estimate(*next(estimates))}"))
+
+        elif kind == "timeline":
+            blocks.append(("heading1", _require(section, "heading", str, where)))
+            header = tuple(_strings(section.get("columns", ["Phase", "Duration", "Key Deliverables"]), f"{where}.columns"))
+            rows = [header]
+            for phase, estimate, phase_where in zip(phases, summary["phases"], phase_wheres):
+                short_title = _optional(phase, "short_title", str, phase_where, None)
+                rows.append((
+                    _require(phase, "title", str, phase_where) if short_title is None else short_title,
+                    format_estimate(*estimate),
+                    _optional(phase, "deliverables", str, phase_where, ""),
+                ))
+            rows.append((
+                _optional(section, "total_label", str, where, "Total"),
+                total_estimate,
+                _optional(section, "total_deliverables", str, where, ""),
+            ))
+            blocks.append(("timeline", tuple(rows)))
+
+        else:
+            blocks.append(("heading1", _require(section, "heading", str, where)))
+            body = _optional(section, "body", str, where, "")
+            if body:
+                blocks.append(("body", body.replace("{total_estimate}", total_estimate).replace("{critical_path}", critical_estimate)))
+            for j, group in enumerate(_optional(section, "groups", list, where, [])):
+                group_where = f"{where}.groups[{j}]"
+                blocks.append(("heading2", _require(group, "heading", str, group_where)))
+                group_summary = _optional(group, "summary", str, group_where, "")
+                if group_summary:
+                    blocks.append(("body", group_summary))
+                for item in _strings(group.get("items", []), f"{group_where}.items"):
+                    blocks.append(("bullet", item))
+
+        if section.get("break_after") == "page":
+            blocks.append(("page_break", None))
+        elif section.get("break_after") == "spacer":
+            spacer = section.get("spacer", DEFAULT_SPACER)
+            if not isinstance(spacer, (int, float)) or isinstance(spacer, bool):
+                raise PlanSpecError(f"{where}.spacer: expected a number")
+            blocks.append(("spacer", spacer))
+
+    return {
+        "title": title,
+        "subtitle": subtitle,
+        "total_estimate": total_estimate,
+        "critical_path": critical_estimate,
+        "schedule": schedule,
+        "toc": toc,
+        "blocks": tuple(blocks),
+    }
+
+
+def _freeze(model):
+    # JSON round-trips tuples as lists; restore them so cached and freshly
+    # compiled models compare equal and can be shared safely
+    blocks = []
+    for kind, arg in model["blocks"]:
+        if kind == "timeline":
+            arg = tuple(tuple(row) for row in arg)
+        blocks.append((kind, arg))
+    return dict(model, blocks=tuple(blocks))
+
+
+def _read_cache(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return _freeze(json.load(f))
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def _write_cache(path, model):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(model, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError:
+        # A read-only cache dir only costs us the speed-up
+        pass
+
+
+def compile_plan_bytes(raw, fmt="json", use_cache=True):
+    """Compile raw spec bytes, reusing a cached model when the content is unchanged."""
+    key = spec_hash(raw)
+    if use_cache and key in _compiled:
+        return _compiled[key]
+
+    cache_path = os.path.join(CACHE_DIR, "plans", f"{key}.json")
+    model = _read_cache(cache_path) if use_cache else None
+    if model is None:
+        model = compile_plan(parse_spec(raw, fmt))
+        if use_cache:
+            _write_cache(cache_path, model)
+
+    if use_cache:
+        if len(_compiled) >= MEMO_SIZE:
+            del _compiled[next(iter(_compiled))]
+        _compiled[key] = model
+    return model
+
+
+def clear_memo():
+    """Forget the compiled models kept in memory (the on-disk cache stays)."""
+    _compiled.clear()
+
+
+def load_plan(path=None, use_cache=True):
+    """Load and compile the plan spec at ``path`` (the bundled plan by default)."""
+    path = path or DEFAULT_SPEC
+    with open(path, "rb") as f:
+        raw = f.read()
+    fmt = "yaml" if path.endswith((".yaml", ".yml")) else "json"
+    return compile_plan_bytes(raw, fmt, use_cache)
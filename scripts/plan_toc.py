@@ -0,0 +1,155 @@
+"""Table of contents without multiBuild.
+
+ReportLab's TableOfContents normally relies on ``doc.multiBuild``, which lays
+the whole document out again and again until the page numbers stop moving.
+build_with_toc() instead fills the TOC with page numbers up front and builds
+once. The numbers come from the pages recorded for the same document last
+time or, failing that, from estimate_pages(), a dry layout run that wraps and
+splits flowables against the page frame without drawing anything (cheap,
+since CachedParagraph memoizes the line breaking the real build reuses).
+
+Headings are marked by setting ``_toc_heading`` on their flowable; each one
+gets a bookmark and an outline entry, and its TOC line links to it. When the
+real build lands a heading on a different page than estimated, the document
+is built exactly once more with the recorded numbers. The TOC's height only
+depends on its entries' text, not their numbers, so the second pass always
+settles.
+"""
+from io import BytesIO
+
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import SimpleDocTemplate
+from reportlab.platypus.tableofcontents import TableOfContents
+
+from fonts import fallback_markup
+from layout_cache import _LRU
+from page_layout import LayoutUnsupported, PageLayout
+from pdf_output import writable
+
+PAGE_CACHE_SIZE = 1024
+
+# Heading pages recorded by earlier builds, keyed by document identity
+_pages = _LRU(PAGE_CACHE_SIZE)
+
+
+def clear_cache():
+    _pages.clear()
+
+
+def toc_key(index):
+    """Bookmark name of the ``index``-th TOC heading."""
+    return f"toc-{index}"
+
+
+class PresetTableOfContents(TableOfContents):
+    """TableOfContents drawn from entries supplied before the build."""
+
+    def preset(self, titles, pages, level=0):
+        font = self.getLevelStyle(level).fontName
+        self._lastEntries = [
+            (level, fallback_markup(title, font), page, toc_key(index))
+            for index, (title, page) in enumerate(zip(titles, pages))
+        ]
+        return self
+
+
+class TOCDocTemplate(SimpleDocTemplate):
+    """SimpleDocTemplate that records where every TOC heading lands.
+
+    With ``outline`` set (the default) each heading is also bookmarked and
+    added to the PDF outline as it is drawn.
+    """
+
+    def __init__(self, *args, outline=True, **kwargs):
+        SimpleDocTemplate.__init__(self, *args, **kwargs)
+        self.outline = outline
+        self.toc_pages = []
+        self.toc_tops = []
+
+    def afterFlowable(self, flowable):
+        if not getattr(flowable, "_toc_heading", False):
+            return
+        # The frame has already moved below the heading and its spaceAfter
+        top = self.frame._y + flowable.getSpaceAfter() + flowable.height
+        self.toc_pages.append(self.page)
+        self.toc_tops.append(top)
+        if self.outline:
+            key = toc_key(len(self.toc_pages) - 1)
+            self.canv.bookmarkPage(key, fit="XYZ", top=top)
+            self.canv.addOutlineEntry(flowable.text, key, 0)
+
+
+class _HeadingLayout(PageLayout):
+    def __init__(self, doc):
+        PageLayout.__init__(self, doc)
+        self.heading_pages = []
+
+    def afterFlowable(self, flowable):
+        if getattr(flowable, "_toc_heading", False):
+            self.heading_pages.append(self.page)
+
+
+def estimate_pages(doc, story):
+    """Return ``(heading_pages, page_count)`` for laying out ``story``.
+
+    ``heading_pages`` lists the page of each ``_toc_heading`` flowable, in
+    order.
+
+    A dry run of SimpleDocTemplate's single-frame layout (see page_layout)
+    without a page template or drawing. Returns ``(None, None)`` when the
+    story does something the estimate does not model, such as a flowable
+    too large for an empty page.
+    """
+    layout = _HeadingLayout(doc)
+    try:
+        layout.add(story)
+    except LayoutUnsupported:
+        return None, None
+    return layout.heading_pages, layout.page_count
+
+
+def build_with_toc(make_doc, make_story, titles, output, key=None, trace=None, canvasmaker=Canvas, meter=None):
+    """Build a document with a table of contents in one pass when possible.
+
+    ``make_doc(stream)`` returns a fresh TOCDocTemplate writing to ``stream``
+    and ``make_story(pages)`` a fresh story whose PresetTableOfContents lists
+    ``titles`` with ``pages``. ``key`` identifies the document for the page
+    cache. ``make_story`` may return a FlowableStream, which is consumed
+    lazily by the estimate as well. Returns the doc of the final pass, with
+    ``build_stats`` recording the number of passes and where the page
+    estimate came from, plus the MemoryMeter's numbers when one is given.
+    """
+    placeholder = [0] * len(titles)
+    pages = _pages.get(key) if key is not None else None
+    source = "cache"
+    if pages is None or len(pages) != len(titles):
+        source = "layout"
+        pages = estimate_pages(make_doc(BytesIO()), make_story(placeholder))[0] or placeholder
+
+    passes = 0
+    while True:
+        passes += 1
+        buffer = BytesIO()
+        doc = make_doc(buffer)
+        if trace is not None:
+            trace.attach(doc)
+        if meter is not None:
+            meter.attach(doc)
+        doc.build(make_story(pages), canvasmaker=canvasmaker)
+        # One extra pass at most: the TOC is the same size either way
+        if doc.toc_pages == pages or passes == 2:
+            break
+        pages = doc.toc_pages
+
+    if key is not None:
+        _pages.put(key, list(doc.toc_pages))
+    doc.build_stats = {"passes": passes, "toc_estimate": source, "toc_settled": doc.toc_pages == pages}
+    if meter is not None:
+        doc.build_stats.update(meter.stats())
+
+    if isinstance(output, str):
+        with open(output, "wb") as f:
+            f.write(buffer.getbuffer())
+    else:
+        writable(output).write(buffer.getbuffer())
+    return doc
@@ -0,0 +1,197 @@
+"""Content-addressed cache of rendered PDFs.
+
+The cache key hashes the normalized document spec, the template/style
+parameters, the renderer version and the fallback fonts installed (and the
+pinned clock in reproducible mode), so a byte-identical PDF is returned for
+a repeated request without running ``doc.build`` again. Entries live in a
+size-bounded in-memory LRU and, optionally, in a size-bounded directory on
+disk. Keys double as strong ETags for HTTP callers.
+"""
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import threading
+
+import reportlab
+
+from fonts import fingerprint
+from plan_spec import CACHE_DIR, COMPILER_VERSION
+from reproducible import source_date_epoch
+
+# Bump whenever a layout change alters the bytes produced for the same input
+RENDERER_VERSION = 2
+
+DEFAULT_MEMORY_BYTES = 64 * 1024 * 1024
+DEFAULT_DISK_BYTES = 1024 * 1024 * 1024
+
+
+def cache_key(kind, spec, template=None):
+    """Hash a document spec, its template parameters and the renderer version."""
+    payload = json.dumps(
+        {
+            "kind": kind,
+            "spec": spec,
+            "template": template,
+            "renderer": [RENDERER_VERSION, COMPILER_VERSION, reportlab.Version],
+            "fonts": fingerprint(),
+            # Reproducible renders never share entries with dated ones
+            "epoch": source_date_epoch(),
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def etag(key):
+    return f'"{key}"'
+
+
+def etag_matches(if_none_match, key):
+    """True if an If-None-Match header value covers ``key``."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag(key) in tags or f"W/{etag(key)}" in tags
+
+
+class RenderCache:
+    """LRU cache of PDF bytes bounded by total size, with an optional disk tier."""
+
+    def __init__(self, max_bytes=DEFAULT_MEMORY_BYTES, directory=None, max_disk_bytes=DEFAULT_DISK_BYTES):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._disk_size = None
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.pdf")
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+        data = self._disk_get(key)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, data)
+        return data
+
+    def put(self, key, data):
+        with self._lock:
+            self._remember(key, data)
+        self._disk_put(key, data)
+
+    def get_or_render(self, key, render):
+        """Return ``(data, hit)``, calling ``render()`` only on a miss."""
+        data = self.get(key)
+        if data is not None:
+            return data, True
+        data = render()
+        self.put(key, data)
+        return data, False
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remember(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._entries[key] = data
+        self._size += len(data)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def _disk_get(self, key):
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # Touch so disk eviction is least-recently-used, not oldest-written
+            os.utime(path)
+        except OSError:
+            return None
+        return data
+
+    def _disk_put(self, key, data):
+        if not self.directory or len(data) > self.max_disk_bytes:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            try:
+                # Overwriting an entry only grows the cache by the difference
+                replaced = os.stat(path).st_size
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp, path)
+        except OSError:
+            return
+        with self._lock:
+            if self._disk_size is None:
+                self._disk_size = sum(size for _, size, _ in self._disk_entries())
+            else:
+                self._disk_size += len(data) - replaced
+            if self._disk_size > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _disk_entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".pdf"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield stat.st_mtime, stat.st_size, path
+
+    def _evict_disk(self):
+        entries = sorted(self._disk_entries())
+        total = sum(size for _, size, _ in entries)
+        # Evict down to 90% so we do not rescan on every subsequent put
+        target = self.max_disk_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        self._disk_size = total
+
+
+_default_cache = None
+
+
+def default_cache():
+    """Process-wide cache; the disk tier lives under BUILDFOLIO_CACHE_DIR/pdf."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = RenderCache(directory=os.path.join(CACHE_DIR, "pdf"))
+    return _default_cache
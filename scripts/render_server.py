@@ -0,0 +1,414 @@
+"""Long-running render daemon.
+
+An asyncio HTTP/1.1 server, on localhost TCP or a Unix socket, that keeps a
+pool of pre-warmed worker processes so single-document requests skip the
+Python start, ReportLab import, font setup and stylesheet construction that
+a fresh ``generate_project_plan.py`` run pays for.
+
+Endpoints:
+
+    POST /render   body is one record as accepted by stream_render.py
+                   ({"formData": ..., "template": ...} or {"plan": ...});
+                   returns application/pdf with an ETag (except for
+                   records with "encrypt" options, which are never cached)
+    POST /layout   same body; returns the page count, section page ranges
+                   and page breaks as JSON without rendering (see
+                   page_layout.py), for live previews
+    GET  /stats    queue depth, in-flight count, counters and latency
+                   percentiles as JSON
+    GET  /healthz  liveness
+
+Layouts run on one thread of the server process itself, so the section cache
+that makes repeated layouts of an edited document cheap is shared by every
+request. Requests beyond ``--max-queue`` outstanding renders are rejected with 503 and
+Retry-After instead of queueing without bound, and each render is limited to
+``--timeout`` seconds (504). Records are checked before they reach a
+worker: malformed requests get 400, documents that cannot be rendered
+(invalid plans or form data, unreadable images) 422. A worker that dies
+mid-render breaks the whole process pool; the server replaces the pool and
+retries the affected renders once. A render that times out before a worker picks
+it up is dropped; one already running keeps its worker busy, and counts
+against ``--max-queue``, until it finishes. Workers report when they start
+a job, so /stats tells queued renders (``queue_depth``) from running ones
+(``in_flight``).
+
+    python scripts/render_server.py --unix /tmp/buildfolio.sock
+    curl --unix-socket /tmp/buildfolio.sock -d @record.json http://localhost/render -o out.pdf
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+
+from images import ImageError
+from plan_spec import PlanSpecError
+from render_cache import RenderCache, etag, etag_matches
+import reproducible
+from resume_renderer import FormDataError
+from stream_render import layout_record, record_cache_key, render_record
+
+MAX_BODY_BYTES = 4 * 1024 * 1024
+LATENCY_WINDOW = 2048
+
+# Well-formed requests for documents that cannot be rendered: 422
+INVALID_DOCUMENT = (FormDataError, ImageError, PlanSpecError)
+
+REASONS = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    422: "Unprocessable Entity",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+    504: "Gateway Timeout",
+}
+
+
+# Worker side of the queue that reports when a job leaves the pool's queue
+_started = None
+
+
+def _warm_worker(started=None):
+    # Import ReportLab, load fonts and build every stylesheet before the
+    # first request arrives by rendering one small document of each kind
+    global _started
+    _started = started
+    from plan_spec import load_plan
+    from resume_renderer import load_templates
+    from style_registry import plan_styles, resume_styles
+
+    plan_styles()
+    for template in load_templates().values():
+        resume_styles(template)
+    load_plan()
+    render_record({"formData": {"fullName": "Warm Up", "skills": ["Python"], "contact": {}}})
+
+
+def _render_job(job_id, record):
+    # Worker: report that the job is running, then render it
+    _started.put(job_id)
+    return render_record(record)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class RenderServer:
+    def __init__(self, workers=None, max_queue=64, timeout=30.0, cache_bytes=64 * 1024 * 1024):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.cache = RenderCache(max_bytes=cache_bytes) if cache_bytes else None
+        self.pool = None
+        self.layout_pool = ThreadPoolExecutor(max_workers=1)
+        # Accepted renders until their worker finishes them, timed out or
+        # not: job id -> "queued" or "running"
+        self.jobs = {}
+        self._job_ids = itertools.count()
+        self._started = None
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.counters = {"requests": 0, "rendered": 0, "laid_out": 0, "cache_hits": 0, "not_modified": 0,
+                         "rejected": 0, "timeouts": 0, "errors": 0, "pool_restarts": 0}
+        self.started = time.time()
+
+    @property
+    def outstanding(self):
+        return len(self.jobs)
+
+    @property
+    def in_flight(self):
+        return sum(state == "running" for state in self.jobs.values())
+
+    def start_pool(self):
+        loop = asyncio.get_running_loop()
+        self._started = multiprocessing.SimpleQueue()
+        threading.Thread(target=self._watch_started, args=(loop, self._started), daemon=True).start()
+        self.pool = self._new_pool()
+        # Spin every worker up now rather than on the first requests
+        for future in [self.pool.submit(os.getpid) for _ in range(self.workers)]:
+            future.result()
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_worker, initargs=(self._started,))
+
+    def _replace_pool(self, broken):
+        # Every render on a broken pool fails at once; only the first to
+        # notice replaces it. The new workers warm up on their first jobs.
+        if self.pool is broken:
+            broken.shutdown(wait=False, cancel_futures=True)
+            self.pool = self._new_pool()
+            self.counters["pool_restarts"] += 1
+
+    def stop_pool(self):
+        self.pool.shutdown(cancel_futures=True)
+        self._started.put(None)
+
+    def _watch_started(self, loop, started):
+        # Thread: forward the workers' start reports to the event loop
+        for job_id in iter(started.get, None):
+            loop.call_soon_threadsafe(self._job_started, job_id)
+
+    def _job_started(self, job_id):
+        # A report can arrive after the job finished; it is dropped then
+        if job_id in self.jobs:
+            self.jobs[job_id] = "running"
+
+    def stats(self):
+        latencies = sorted(self.latencies)
+        in_flight = self.in_flight
+        return {
+            "workers": self.workers,
+            "queue_depth": self.outstanding - in_flight,
+            "in_flight": in_flight,
+            "max_queue": self.max_queue,
+            "uptime_s": round(time.time() - self.started, 1),
+            "counters": dict(self.counters),
+            "latency_ms": {
+                "samples": len(latencies),
+                "p50": percentile(latencies, 0.50),
+                "p90": percentile(latencies, 0.90),
+                "p99": percentile(latencies, 0.99),
+                "max": latencies[-1] if latencies else None,
+            },
+            "cache": {"hits": self.cache.hits, "misses": self.cache.misses} if self.cache else None,
+        }
+
+    def _submit(self, pool, record):
+        # The job counts against the queue until its worker is done with it,
+        # even when the request has already timed out
+        loop = asyncio.get_running_loop()
+        job_id = next(self._job_ids)
+        future = pool.submit(_render_job, job_id, record)
+        self.jobs[job_id] = "queued"
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self.jobs.pop, job_id, None))
+        return future
+
+    async def render(self, body, headers):
+        """Return ``(status, headers, payload)`` for a POST /render body."""
+        try:
+            record = json.loads(body)
+            if not isinstance(record, dict):
+                raise ValueError("record must be a JSON object")
+            # Computing the key checks the form data or compiles the plan, so
+            # invalid records are turned away before they reach a worker
+            key = record_cache_key(record)
+            if record.get("encrypt"):
+                # Encrypted PDFs are never cached or revalidated: their bytes
+                # differ on every render and the key would cover the passwords
+                from pdf_security import encryption
+
+                encryption(record["encrypt"])
+                key = None
+        except INVALID_DOCUMENT as e:
+            return 422, {}, _json({"error": str(e)})
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {}, _json({"error": str(e)})
+
+        if key is not None and etag_matches(headers.get("if-none-match"), key):
+            self.counters["not_modified"] += 1
+            return 304, {"ETag": etag(key)}, b""
+
+        data = self.cache.get(key) if self.cache and key is not None else None
+        if data is not None:
+            self.counters["cache_hits"] += 1
+            return 200, {"Content-Type": "application/pdf", "ETag": etag(key)}, data
+
+        # Backpressure: refuse instead of queueing without bound
+        if self.outstanding >= self.max_queue:
+            self.counters["rejected"] += 1
+            return 503, {"Retry-After": "1"}, _json({"error": "render queue is full"})
+
+        start = time.perf_counter()
+        for retry in (True, False):
+            pool = self.pool
+            try:
+                future = self._submit(pool, record)
+                data = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), self.timeout)
+                break
+            except BrokenProcessPool as e:
+                # A worker died (killed, out of memory, crashed in C code)
+                self._replace_pool(pool)
+                if not retry:
+                    self.counters["errors"] += 1
+                    return 500, {}, _json({"error": f"{type(e).__name__}: {e}"})
+            except asyncio.TimeoutError:
+                # Drops the job if no worker has picked it up yet; a running
+                # render cannot be interrupted and keeps its slot until it ends
+                future.cancel()
+                self.counters["timeouts"] += 1
+                return 504, {}, _json({"error": f"render exceeded {self.timeout:g}s"})
+            except INVALID_DOCUMENT as e:
+                return 422, {}, _json({"error": str(e)})
+            except Exception as e:
+                self.counters["errors"] += 1
+                return 500, {}, _json({"error": f"{type(e).__name__}: {e}"})
+
+        self.latencies.append(round((time.perf_counter() - start) * 1000, 2))
+        self.counters["rendered"] += 1
+        if key is None:
+            return 200, {"Content-Type": "application/pdf"}, data
+        if self.cache:
+            self.cache.put(key, data)
+        return 200, {"Content-Type": "application/pdf", "ETag": etag(key)}, data
+
+    async def layout(self, body):
+        """Return ``(status, headers, payload)`` for a POST /layout body."""
+        from page_layout import LayoutUnsupported
+
+        try:
+            record = json.loads(body)
+            if not isinstance(record, dict):
+                raise ValueError("record must be a JSON object")
+        except ValueError as e:
+            return 400, {}, _json({"error": str(e)})
+        loop = asyncio.get_running_loop()
+        try:
+            result = await asyncio.wait_for(loop.run_in_executor(self.layout_pool, layout_record, record), self.timeout)
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            return 504, {}, _json({"error": f"layout exceeded {self.timeout:g}s"})
+        except (LayoutUnsupported, *INVALID_DOCUMENT) as e:
+            return 422, {}, _json({"error": str(e)})
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {}, _json({"error": str(e)})
+        except Exception as e:
+            self.counters["errors"] += 1
+            return 500, {}, _json({"error": f"{type(e).__name__}: {e}"})
+        self.counters["laid_out"] += 1
+        return 200, {"Content-Type": "application/json"}, _json(result)
+
+    async def dispatch(self, method, path, headers, body):
+        if path in ("/render", "/layout"):
+            if method != "POST":
+                return 405, {"Allow": "POST"}, b""
+            if path == "/layout":
+                return await self.layout(body)
+            return await self.render(body, headers)
+        if path == "/stats" and method == "GET":
+            return 200, {"Content-Type": "application/json"}, _json(self.stats())
+        if path == "/healthz" and method == "GET":
+            return 200, {"Content-Type": "text/plain"}, b"ok\n"
+        return 404, {}, b""
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode("latin1").split()
+                except ValueError:
+                    await _respond(writer, 400, {}, b"", keep_alive=False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await _respond(writer, 400, {}, _json({"error": "invalid Content-Length"}), keep_alive=False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await _respond(writer, 413, {}, b"", keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                self.counters["requests"] += 1
+                status, extra, payload = await self.dispatch(method, path.split("?")[0], headers, body)
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+                await _respond(writer, status, extra, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+def _json(value):
+    return (json.dumps(value) + "\n").encode("utf-8")
+
+
+async def _respond(writer, status, headers, payload, keep_alive):
+    lines = [f"HTTP/1.1 {status} {REASONS.get(status, '')}"]
+    headers = dict(headers, **{"Content-Length": str(len(payload)), "Connection": "keep-alive" if keep_alive else "close"})
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin1"))
+    if payload:
+        writer.write(payload)
+    await writer.drain()
+
+
+async def serve(server, host="127.0.0.1", port=8765, unix=None):
+    server.start_pool()
+    if unix:
+        if os.path.exists(unix):
+            os.unlink(unix)
+        listener = await asyncio.start_unix_server(server.handle, path=unix)
+        where = unix
+    else:
+        listener = await asyncio.start_server(server.handle, host, port)
+        where = f"http://{host}:{port}"
+    print(f"🚀 Render server listening on {where} with {server.workers} warm workers", file=sys.stderr)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    try:
+        async with listener:
+            await stop.wait()
+    finally:
+        server.stop_pool()
+        server.layout_pool.shutdown(cancel_futures=True)
+        if unix and os.path.exists(unix):
+            os.unlink(unix)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve PDF renders from a pool of warm workers.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on this Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--max-queue", type=int, default=64, help="max outstanding renders before 503")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request render timeout in seconds")
+    parser.add_argument("--cache-mb", type=int, default=64, help="in-memory output cache size, 0 to disable")
+    parser.add_argument("--reproducible", action="store_true", help="identical records render to identical bytes (see reproducible.py)")
+    args = parser.parse_args(argv)
+    if args.reproducible:
+        # Before the pool starts, so the workers inherit it
+        reproducible.enable()
+
+    server = RenderServer(args.workers, args.max_queue, args.timeout, args.cache_mb * 1024 * 1024)
+    asyncio.run(serve(server, args.host, args.port, args.unix))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Reproducible output: identical input renders to identical bytes.
+
+Two things make a PDF differ between two renders of the same input: the
+creation and modification dates ReportLab writes into every document (and
+the plan's "Generated on" date), and the document ID, which ReportLab
+derives from the creation time. Everything else, including the object
+order, already follows the input alone.
+
+Reproducible mode pins the clock through SOURCE_DATE_EPOCH, the variable
+ReportLab itself honours for document dates, so worker processes inherit
+it. The renderers then seed each document's ID with a hash of the input it
+is built from (see ``pinned``), so the same input gets the same ID, and the
+same bytes, on any machine, and byte-level caches and deduplication can
+key on the output. Encrypted documents never reproduce: their keys and IVs
+are random by design.
+
+Nothing here imports ReportLab.
+"""
+from datetime import datetime, timezone
+import hashlib
+import json
+import os
+
+# ReportLab's date for invariant documents, 2000-01-01 UTC
+DEFAULT_EPOCH = 946684800
+
+
+def source_date_epoch():
+    """The pinned clock in seconds since the epoch, or None."""
+    value = os.environ.get("SOURCE_DATE_EPOCH", "").strip()
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"SOURCE_DATE_EPOCH: expected an integer, got {value!r}") from None
+
+
+def enable(epoch=None):
+    """Turn on reproducible mode for this process and the workers it starts.
+
+    Without ``epoch`` a SOURCE_DATE_EPOCH already set in the environment is
+    kept, and DEFAULT_EPOCH used otherwise.
+    """
+    if epoch is None:
+        os.environ.setdefault("SOURCE_DATE_EPOCH", str(DEFAULT_EPOCH))
+    else:
+        os.environ["SOURCE_DATE_EPOCH"] = str(int(epoch))
+    source_date_epoch()
+
+
+def enabled():
+    return source_date_epoch() is not None
+
+
+def now():
+    """The current time, or the pinned time (in UTC) in reproducible mode."""
+    epoch = source_date_epoch()
+    if epoch is None:
+        return datetime.now()
+    return datetime.fromtimestamp(epoch, timezone.utc)
+
+
+def content_id(kind, spec, extra=None):
+    """Hash of the input a document is built from, to derive its ID.
+
+    Unlike render_cache.cache_key this leaves out versions and font file
+    stamps: those change the bytes anyway when they matter, and two hosts
+    with the same fonts installed at different times should agree.
+    """
+    payload = json.dumps([kind, spec, extra], sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def pinned(canvasmaker, key):
+    """``canvasmaker`` for documents whose ID derives from ``key``.
+
+    The key goes into the signature ReportLab hashes into the ID, rather
+    than replacing the ID, so encryption (which is keyed on the same
+    signature) stays consistent with it.
+    """
+    def make(*args, **kwargs):
+        canv = canvasmaker(*args, **kwargs)
+        canv._doc.updateSignature(key)
+        return canv
+    return make
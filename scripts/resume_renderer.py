@@ -0,0 +1,430 @@
+"""Server-side resume renderer.
+
+Renders the ``FormData`` payload from types/index.ts with the colour scheme
+and typography of a ``TemplateStyle`` from types/templates.ts into a vector
+PDF with ReportLab. Unlike the browser path in utils/pdf-generator.ts this
+runs headless and keeps text as text, so batches of resumes can be
+regenerated whenever a template changes.
+
+FormData may also carry an optional ``photo`` and ``logo`` (a data URL, or
+a file under public/ such as "/placeholder-user.jpg"); both go through the
+shared image cache in images.py.
+
+Documents can be password protected by passing encryption options (see
+pdf_security.py); encrypted renders bypass the output cache. For live
+previews, resume_layout() returns the page count and page breaks without
+rendering (see page_layout.py).
+"""
+from functools import lru_cache
+from io import BytesIO
+import json
+import os
+import re
+import sys
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import mm
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import HRFlowable, KeepTogether, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from images import ImageFlowable, draw_image, prepare, source_digest
+from layout_cache import CachedParagraph
+from page_layout import layout_sections
+from pdf_output import render_to, render_view, writable
+from pdf_security import encryption
+from render_cache import cache_key
+import reproducible
+from style_registry import resume_styles
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATES_TS = os.path.join(SCRIPTS_DIR, os.pardir, "types", "templates.ts")
+DEFAULT_TEMPLATE_ID = "modern-professional"
+
+# Box sizes for the optional FormData "photo" (header) and "logo" (top right
+# of every page)
+PHOTO_SIZE = (28 * mm, 28 * mm)
+LOGO_SIZE = (24 * mm, 10 * mm)
+
+# FormData fields read by the renderer, as typed in types/index.ts; any of
+# them may be missing, and text fields may be null
+TEXT_FIELDS = ("fullName", "aboutMe", "photo", "logo")
+CONTACT_FIELDS = ("email", "phone", "linkedin", "github")
+ITEM_FIELDS = {
+    "experience": ("company", "role", "duration"),
+    "projects": ("title", "description", "techUsed", "githubLink"),
+    "education": ("institution", "degree", "year"),
+}
+
+# The TemplateStyle fields that change a rendered resume
+TEMPLATE_RENDER_FIELDS = ("colorScheme", "typography", "headerStyle", "sectionStyle", "name")
+
+
+class FormDataError(ValueError):
+    """Raised when a FormData payload does not have the shape of types/index.ts."""
+
+
+def _check_text(obj, fields, where):
+    for field in fields:
+        if not isinstance(obj.get(field), (str, type(None))):
+            raise FormDataError(f"{where}.{field}: expected a string")
+
+
+def check_form_data(form_data):
+    """Raise FormDataError unless ``form_data`` has the shape the renderer reads."""
+    if not isinstance(form_data, dict):
+        raise FormDataError("formData: expected an object")
+    _check_text(form_data, TEXT_FIELDS, "formData")
+    skills = form_data.get("skills") or []
+    if not isinstance(skills, list) or not all(isinstance(skill, str) for skill in skills):
+        raise FormDataError("formData.skills: expected a list of strings")
+    contact = form_data.get("contact", {})
+    if not isinstance(contact, dict):
+        raise FormDataError("formData.contact: expected an object")
+    _check_text(contact, CONTACT_FIELDS, "formData.contact")
+    for field, keys in ITEM_FIELDS.items():
+        items = form_data.get(field, [])
+        if not isinstance(items, list):
+            raise FormDataError(f"formData.{field}: expected a list")
+        for i, item in enumerate(items):
+            if not isinstance(item, dict):
+                raise FormDataError(f"formData.{field}[{i}]: expected an object")
+            _check_text(item, keys, f"formData.{field}[{i}]")
+
+
+@lru_cache(maxsize=None)
+def load_templates(path=TEMPLATES_TS):
+    """Read TEMPLATE_STYLES out of types/templates.ts so the two never drift."""
+    with open(path, encoding="utf-8") as f:
+        source = f.read()
+    start = source.index("=", source.index("TEMPLATE_STYLES"))
+    literal = source[source.index("[", start):source.rindex("]") + 1]
+    # The TS literal is JSON apart from bare keys and trailing commas
+    literal = re.sub(r"^(\s*)(\w+):", r'\1"\2":', literal, flags=re.MULTILINE)
+    literal = re.sub(r",(\s*[}\]])", r"\1", literal)
+    return {template["id"]: template for template in json.loads(literal)}
+
+
+def get_template(template=None):
+    """Resolve a template id or ``TemplateStyle`` dict (default: Modern Professional)."""
+    if isinstance(template, dict):
+        return template
+    templates = load_templates()
+    template_id = template or DEFAULT_TEMPLATE_ID
+    if template_id not in templates:
+        raise ValueError(f"unknown template: {template_id}")
+    return templates[template_id]
+
+
+def _text(value):
+    # Escape paragraph markup; xml.sax.saxutils costs more to import than this
+    return (value or "").replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _section(title, styles, template):
+    # Section titles repeat in every resume, so their layout is cached
+    flowables = [CachedParagraph(_text(title), styles["section"])]
+    if template["sectionStyle"] == "bordered":
+        flowables.append(HRFlowable(width="100%", thickness=1.5, color=styles["colors"]["accent"], spaceBefore=0, spaceAfter=6))
+    return flowables
+
+
+def _dated_item(title, date, styles):
+    # Title on the left, date on the right, like .item-header in the HTML export
+    table = Table(
+        [[CachedParagraph(_text(title), styles["item_title"]), CachedParagraph(_text(date), styles["contact_right"])]],
+        colWidths=["75%", "25%"],
+    )
+    table.setStyle(TableStyle([
+        ("VALIGN", (0, 0), (-1, -1), "TOP"),
+        ("LEFTPADDING", (0, 0), (-1, -1), 0),
+        ("RIGHTPADDING", (0, 0), (-1, -1), 0),
+        ("TOPPADDING", (0, 0), (-1, -1), 0),
+        ("BOTTOMPADDING", (0, 0), (-1, -1), 2),
+    ]))
+    return table
+
+
+def _header(form_data, template, styles):
+    contact = form_data.get("contact", {})
+    details = [
+        contact.get("email"),
+        contact.get("phone"),
+        contact.get("linkedin"),
+        contact.get("github"),
+    ]
+    name = CachedParagraph(_text(form_data.get("fullName") or "Your Name"), styles["name"])
+    if template["headerStyle"] == "split":
+        left = [name, CachedParagraph(" | ".join(_text(d) for d in details[:2] if d), styles["contact"])]
+        right = [CachedParagraph(_text(d), styles["contact_right"]) for d in details[2:] if d]
+        table = Table([[left, right]], colWidths=["60%", "40%"])
+        table.setStyle(TableStyle([
+            ("VALIGN", (0, 0), (-1, -1), "TOP"),
+            ("LEFTPADDING", (0, 0), (-1, -1), 0),
+            ("RIGHTPADDING", (0, 0), (-1, -1), 0),
+        ]))
+        header = [table]
+    else:
+        header = [name, CachedParagraph(" | ".join(_text(d) for d in details if d), styles["contact"])]
+    if form_data.get("photo"):
+        # Photo on the left of the header, decoded once per worker (see images.py)
+        photo = ImageFlowable(form_data["photo"], *PHOTO_SIZE)
+        table = Table([[photo, header]], colWidths=[photo.width + 6 * mm, None])
+        table.setStyle(TableStyle([
+            ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+            ("LEFTPADDING", (0, 0), (-1, -1), 0),
+            ("RIGHTPADDING", (0, 0), (-1, -1), 0),
+        ]))
+        header = [table]
+    return header + [Spacer(1, 8 * mm)]
+
+
+def _experience(experience, template, styles):
+    story = _section("Experience", styles, template)
+    for exp in experience:
+        story.append(KeepTogether([
+            _dated_item(exp.get("role"), exp.get("duration"), styles),
+            CachedParagraph(_text(exp.get("company")), styles["item_subtitle"]),
+        ]))
+    return story
+
+
+def _projects(projects, template, styles):
+    story = _section("Projects", styles, template)
+    for project in projects:
+        item = [CachedParagraph(_text(project["title"]), styles["item_title"])]
+        if project.get("description"):
+            item.append(CachedParagraph(_text(project["description"]), styles["body"]))
+        if project.get("techUsed"):
+            item.append(CachedParagraph(f"Technologies: {_text(project['techUsed'])}", styles["item_subtitle"]))
+        if project.get("githubLink"):
+            item.append(CachedParagraph(_text(project["githubLink"]), styles["item_subtitle"]))
+        story.append(KeepTogether(item))
+    return story
+
+
+def _education(education, template, styles):
+    story = _section("Education", styles, template)
+    for edu in education:
+        story.append(KeepTogether([
+            _dated_item(edu.get("degree"), edu.get("year"), styles),
+            CachedParagraph(_text(edu.get("institution")), styles["item_subtitle"]),
+        ]))
+    return story
+
+
+def resume_sections(form_data, template, styles):
+    """``(title, content, build)`` for each section of a resume, in order.
+
+    ``content`` is the part of ``form_data`` the section is drawn from and
+    ``build()`` returns its flowables (see page_layout.layout_sections).
+    """
+    header = {field: form_data.get(field) for field in ("fullName", "contact")}
+    if form_data.get("photo"):
+        header["photo"] = source_digest(form_data["photo"])
+    sections = [("Header", header, lambda: _header(form_data, template, styles))]
+
+    if form_data.get("aboutMe"):
+        about = form_data["aboutMe"]
+        sections.append(("About Me", about, lambda: _section("About Me", styles, template) + [
+            CachedParagraph(_text(about), styles["body"]),
+        ]))
+
+    if form_data.get("skills"):
+        skills = form_data["skills"]
+        sections.append(("Skills", skills, lambda: _section("Skills", styles, template) + [
+            CachedParagraph(" • ".join(_text(skill) for skill in skills), styles["body"]),
+        ]))
+
+    experience = [exp for exp in form_data.get("experience", []) if exp.get("company") or exp.get("role")]
+    if experience:
+        sections.append(("Experience", experience, lambda: _experience(experience, template, styles)))
+
+    projects = [project for project in form_data.get("projects", []) if project.get("title")]
+    if projects:
+        sections.append(("Projects", projects, lambda: _projects(projects, template, styles)))
+
+    education = [edu for edu in form_data.get("education", []) if edu.get("institution") or edu.get("degree")]
+    if education:
+        sections.append(("Education", education, lambda: _education(education, template, styles)))
+    return sections
+
+
+def build_resume_story(form_data, template, styles):
+    return [flowable for _, _, build in resume_sections(form_data, template, styles) for flowable in build()]
+
+
+def _resume_spec(form_data):
+    # Images are referenced by path, so their content is part of the input
+    images = {field: source_digest(form_data[field]) for field in ("photo", "logo") if form_data.get(field)}
+    return dict(form_data, _images=images) if images else form_data
+
+
+def _template_spec(template):
+    # Only what a render depends on: the theme_key fields plus the name,
+    # which goes into the document title. Edits to a template's thumbnail
+    # or description must not invalidate its cached PDFs
+    return {field: template[field] for field in TEMPLATE_RENDER_FIELDS}
+
+
+def resume_cache_key(form_data, template=None):
+    check_form_data(form_data)
+    return cache_key("resume", _resume_spec(form_data), _template_spec(get_template(template)))
+
+
+def _logo_painter(source):
+    image = prepare(source, *LOGO_SIZE)
+    width, height = image.fit(*LOGO_SIZE)
+
+    def paint(canv, doc):
+        x = doc.pagesize[0] - doc.rightMargin - width
+        y = doc.pagesize[1] - doc.topMargin + 2 * mm
+        draw_image(canv, image, x, y, width, height)
+    return paint
+
+
+def resume_doc(output, form_data, template, encrypt=None):
+    return SimpleDocTemplate(
+        output,
+        pagesize=A4,
+        leftMargin=15 * mm,
+        rightMargin=15 * mm,
+        topMargin=15 * mm,
+        bottomMargin=15 * mm,
+        title=f"{form_data.get('fullName') or 'Resume'} - {template['name']}",
+        author=form_data.get("fullName") or "Resume Builder User",
+        creator="BuildFolio",
+        encrypt=encryption(encrypt),
+    )
+
+
+def build_resume_pdf(form_data, template, output, trace=None, encrypt=None):
+    # output is a filename or a writable binary file object; encrypt holds
+    # the encryption options, if any
+    check_form_data(form_data)
+    template = get_template(template)
+    doc = resume_doc(output, form_data, template, encrypt)
+    if trace is not None:
+        trace.attach(doc)
+    story = build_resume_story(form_data, template, resume_styles(template))
+    options = {}
+    if form_data.get("logo"):
+        paint = _logo_painter(form_data["logo"])
+        options.update(onFirstPage=paint, onLaterPages=paint)
+    if reproducible.enabled():
+        options["canvasmaker"] = reproducible.pinned(Canvas, reproducible.content_id("resume", _resume_spec(form_data), _template_spec(template)))
+    doc.build(story, **options)
+    return doc
+
+
+def render_resume(form_data, template=None, cache=None, trace=None, encrypt=None):
+    """Render one resume and return the PDF bytes.
+
+    With a ``RenderCache``, identical form data and template return the
+    stored bytes instead of rebuilding the document. A ``BuildTrace``
+    records per-flowable and per-page timings (and skips the cache), as do
+    ``encrypt`` options: passwords never end up in cache keys.
+    """
+    template = get_template(template)
+    if cache is not None and trace is None and not encrypt:
+        data, _ = cache.get_or_render(
+            resume_cache_key(form_data, template),
+            lambda: render_resume(form_data, template),
+        )
+        return data
+
+    buffer = BytesIO()
+    build_resume_pdf(form_data, template, buffer, trace, encrypt)
+    return buffer.getvalue()
+
+
+def resume_layout(form_data, template=None):
+    """Page count, section page ranges and page breaks of a resume, without rendering it.
+
+    Sections unchanged since an earlier call are not laid out again; see
+    page_layout.layout_sections for the result.
+    """
+    check_form_data(form_data)
+    template = get_template(template)
+    doc = resume_doc(BytesIO(), form_data, template)
+    sections = resume_sections(form_data, template, resume_styles(template))
+    return layout_sections(doc, sections, cache_key("resume-layout", None, _template_spec(template)))
+
+
+def write_resume(output, form_data, template=None, cache=None, encrypt=None):
+    """Render a resume straight into a writable binary stream (file, BytesIO, pipe or socket)."""
+    if cache is not None and not encrypt:
+        writable(output).write(render_resume(form_data, template, cache))
+        return output
+    return render_to(output, lambda stream: build_resume_pdf(form_data, template, stream, encrypt=encrypt))
+
+
+def resume_pdf_view(form_data, template=None, encrypt=None):
+    """Render a resume in memory and return a zero-copy memoryview of the PDF."""
+    return render_view(lambda stream: build_resume_pdf(form_data, template, stream, encrypt=encrypt))
+
+
+def resume_filename(form_data, template, index=None):
+    # Same scheme as generatePDF(), minus the date so reruns overwrite
+    template = get_template(template)
+    user_name = re.sub(r"[^a-zA-Z0-9]", "_", form_data.get("fullName") or "") or "Resume"
+    template_name = re.sub(r"\s+", "_", template["name"])
+    prefix = f"{index:06d}_" if index is not None else ""
+    return f"{prefix}{user_name}_{template_name}.pdf"
+
+
+def _warm_worker():
+    # Pay for template parsing and font metrics once per worker, not per job
+    for template in load_templates().values():
+        resume_styles(template)
+
+
+def _job_path(output_dir, job_id):
+    # Like stream_render.record_name: a job id names a file in output_dir and
+    # nothing else, so "../x" or "/etc/x" cannot write elsewhere
+    name = re.sub(r"[^A-Za-z0-9._-]", "_", os.path.basename(str(job_id))).lstrip(".") or "_"
+    if not name.endswith(".pdf"):
+        name += ".pdf"
+    path = os.path.join(output_dir, name)
+    # A symlink planted in output_dir would still lead out of it
+    if os.path.dirname(os.path.realpath(path)) != os.path.realpath(output_dir):
+        raise ValueError(f"job id {job_id!r} resolves outside the output directory")
+    return path
+
+
+def _render_job(args):
+    index, job, output_dir = args
+    form_data = job["formData"]
+    template = job.get("template")
+    path = _job_path(output_dir, job.get("id") or resume_filename(form_data, template, index))
+    data = render_resume(form_data, template, encrypt=job.get("encrypt"))
+    with open(path, "wb") as f:
+        f.write(data)
+    return path, len(data)
+
+
+def render_batch(jobs, output_dir, workers=None, chunksize=16):
+    """Render ``{"formData": ..., "template": ...}`` jobs across a process pool.
+
+    A job may also carry ``"encrypt"`` options to password protect its PDF.
+
+    Yields ``(path, size)`` for each written PDF, in job order.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    os.makedirs(output_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    tasks = ((index, job, output_dir) for index, job in enumerate(jobs))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm_worker) as pool:
+        yield from pool.map(_render_job, tasks, chunksize=chunksize)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("usage: resume_renderer.py JOBS.json OUTPUT_DIR")
+        sys.exit(2)
+    with open(sys.argv[1], encoding="utf-8") as f:
+        jobs = json.load(f)
+    count = 0
+    for path, size in render_batch(jobs, sys.argv[2]):
+        count += 1
+    print(f"✅ Rendered {count} resumes into {sys.argv[2]}")
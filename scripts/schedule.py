@@ -0,0 +1,133 @@
+"""Schedule estimates derived from task-level hours and phase dependencies.
+
+compile_plan() lowers every phase to a schedule entry: the ``[min, max]``
+hours of its tasks (or the phase's own estimate when its tasks carry none)
+and the indices of the phases it depends on. From those the engine derives
+each phase's range, the total effort and the critical path, the longest
+chain of dependent phases, which is the shortest possible completion time.
+
+simulate() adds a Monte Carlo view over many plans at once. Task hours are
+drawn uniformly from their ranges, phases finish after their slowest
+dependency, and the chosen percentiles of the completion time come back as
+one array. All plans in a batch are padded to the same shape and sampled
+together with NumPy, looping only over phase positions. NumPy is imported
+on demand; nothing else here needs it.
+"""
+
+DEFAULT_SAMPLES = 1000
+DEFAULT_PERCENTILES = (50, 90)
+
+# Samples are float32: ample for hour estimates, and half the memory traffic.
+# Upper bound on sampled task hours held at once (plans x samples x tasks);
+# larger batches are simulated a slice of plans at a time
+MAX_BATCH_CELLS = 1 << 23
+
+
+def phase_range(tasks):
+    """Summed ``(min, max)`` hours of a phase's ``[min, max]`` task ranges."""
+    return sum(low for low, _ in tasks), sum(high for _, high in tasks)
+
+
+def critical_path(durations, depends_on):
+    """Length and phase indices of the longest dependency chain.
+
+    ``depends_on[i]`` lists phases before ``i`` that must finish first.
+    """
+    finish = []
+    before = []
+    for duration, deps in zip(durations, depends_on):
+        prev = max(deps, key=finish.__getitem__, default=None)
+        finish.append(duration + (finish[prev] if prev is not None else 0))
+        before.append(prev)
+    if not finish:
+        return 0, []
+    end = max(range(len(finish)), key=finish.__getitem__)
+    length = finish[end]
+    path = []
+    while end is not None:
+        path.append(end)
+        end = before[end]
+    return length, path[::-1]
+
+
+def summarize(schedule):
+    """Phase ranges, total effort and critical path of a compiled schedule."""
+    ranges = [phase_range(phase["tasks"]) for phase in schedule]
+    deps = [phase["depends_on"] for phase in schedule]
+    low, path = critical_path([r[0] for r in ranges], deps)
+    high, _ = critical_path([r[1] for r in ranges], deps)
+    return {
+        "phases": ranges,
+        "total": phase_range(ranges),
+        "critical_path": (low, high),
+        "critical_phases": path,
+    }
+
+
+def _pack(np, schedules):
+    # Pad a batch to common task and phase counts. Every plan's row ends in
+    # at least one padded task with a zero range; its phases are given as
+    # offsets of their first task into the flattened rows, for reduceat, and
+    # padded phases start at that zero task. Padded phases depend on nothing
+    tasks = max((sum(len(p["tasks"]) for p in s) for s in schedules), default=0) + 1
+    phases = max((len(s) for s in schedules), default=0)
+    low = np.zeros((len(schedules), tasks), dtype=np.float32)
+    span = np.zeros((len(schedules), tasks), dtype=np.float32)
+    starts = np.empty((len(schedules), phases), dtype=np.intp)
+    after = np.zeros((len(schedules), phases, phases), dtype=bool)
+    for n, schedule in enumerate(schedules):
+        t = 0
+        for p, phase in enumerate(schedule):
+            starts[n, p] = n * tasks + t
+            for task_low, task_high in phase["tasks"]:
+                low[n, t] = task_low
+                span[n, t] = task_high - task_low
+                t += 1
+            after[n, p, phase["depends_on"]] = True
+        starts[n, len(schedule):] = n * tasks + tasks - 1
+    return low, span, starts, after
+
+
+def _simulate_batch(np, rng, schedules, samples, percentiles):
+    low, span, starts, after = _pack(np, schedules)
+    hours = rng.random((samples,) + low.shape, dtype=np.float32)
+    hours *= span
+    hours += low
+    # Sum each phase's run of tasks, then put phases on the leading axis so
+    # each step works on whole (plans, samples) slabs. A phase's run ends
+    # where the next one starts, taking in the zero padding after the last
+    # phase; reduceat gives a padded phase (whose run would be empty) the
+    # zero task it starts at
+    durations = np.add.reduceat(hours.reshape(samples, -1), starts.ravel(), axis=1)
+    durations = np.ascontiguousarray(durations.reshape(samples, *starts.shape).transpose(2, 1, 0))
+    finish = np.empty_like(durations)
+    for p in range(len(durations)):
+        start = np.zeros_like(durations[p])
+        for dep in np.flatnonzero(after[:, p, :p].any(axis=0)):
+            np.maximum(start, np.where(after[:, p, dep, None], finish[dep], 0), out=start)
+        finish[p] = start + durations[p]
+    return np.percentile(finish.max(axis=0, initial=0), percentiles, axis=1).T
+
+
+def simulate(schedules, samples=DEFAULT_SAMPLES, percentiles=DEFAULT_PERCENTILES, seed=None):
+    """Monte Carlo completion times for a batch of compiled schedules.
+
+    Returns an array of shape ``(len(schedules), len(percentiles))`` holding
+    the requested percentiles of each plan's completion time in hours.
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        raise RuntimeError("NumPy is required for Monte Carlo schedule estimates") from None
+
+    rng = np.random.default_rng(seed)
+    schedules = list(schedules)
+    tasks = max((sum(len(p["tasks"]) for p in s) for s in schedules), default=0) + 1
+    step = max(1, MAX_BATCH_CELLS // max(1, samples * tasks))
+    results = [
+        _simulate_batch(np, rng, schedules[i:i + step], samples, percentiles)
+        for i in range(0, len(schedules), step)
+    ]
+    if not results:
+        return np.zeros((0, len(percentiles)))
+    return np.concatenate(results)
@@ -0,0 +1,244 @@
+"""Streaming JSONL-in / PDFs-out renderer.
+
+Reads one document spec per line from a JSONL file (or stdin) and writes each
+PDF as soon as it is built, either into a directory or into a tar stream.
+A JSONL status line is emitted per record. Records are never collected into a
+list: at most ``--window`` records are in flight at any time, so memory stays
+flat however long the input is.
+
+Each line is a JSON object with either ``formData`` (and optionally
+``template``) for a resume, or ``plan`` holding a plan spec. An optional
+``id`` names the output file; otherwise the line number is used. An optional
+``encrypt`` object password protects the PDF (see pdf_security.py).
+
+Directory output is resumable: records whose PDF already exists are skipped,
+and PDFs are written via a temporary file and renamed, so a crash never
+leaves a truncated output behind.
+
+With ``--reproducible`` the same record always renders to the same bytes,
+and tar entries carry the pinned date instead of the current time.
+"""
+from collections import deque
+from concurrent.futures import Future
+from io import BytesIO
+import argparse
+import json
+import os
+import re
+import sys
+import tarfile
+import time
+
+import reproducible
+
+
+def read_records(stream):
+    for line_number, line in enumerate(stream, 1):
+        line = line.strip()
+        if line:
+            yield line_number, line
+
+
+def record_name(record, line_number):
+    name = str(record.get("id") or f"record-{line_number:08d}")
+    return re.sub(r"[^A-Za-z0-9._-]", "_", name) + ".pdf"
+
+
+def render_record(record, cache=None):
+    """Render one JSONL record to PDF bytes."""
+    # Renderers are imported on first use so resume-only runs never load
+    # the plan generator and vice versa
+    if "formData" in record:
+        from resume_renderer import render_resume
+        return render_resume(record["formData"], record.get("template"), cache, encrypt=record.get("encrypt"))
+    if "plan" in record:
+        from generate_project_plan import render_plan
+        return render_plan(record["plan"], cache, record.get("encrypt"))
+    raise ValueError("record needs a 'formData' or 'plan' key")
+
+
+def layout_record(record):
+    """Page count, section page ranges and page breaks of a record, without rendering it."""
+    if "formData" in record:
+        from resume_renderer import resume_layout
+        return resume_layout(record["formData"], record.get("template"))
+    if "plan" in record:
+        from generate_project_plan import plan_layout
+        from plan_spec import compile_plan
+        return plan_layout(compile_plan(record["plan"]))
+    raise ValueError("record needs a 'formData' or 'plan' key")
+
+
+def record_cache_key(record):
+    """Output cache key (and ETag) for a record, without rendering it.
+
+    The same key render_record() stores the PDF under: plans are compiled
+    first, so specs that differ only in formatting or defaulted fields share
+    an entry. Raises PlanSpecError for an invalid plan and FormDataError for
+    form data the resume renderer cannot read.
+    """
+    if "formData" in record:
+        from resume_renderer import resume_cache_key
+        return resume_cache_key(record["formData"], record.get("template"))
+    if "plan" in record:
+        from generate_project_plan import generated_on_today, plan_cache_key
+        from plan_spec import compile_plan
+        # Plans carry the generation date on their title page
+        return plan_cache_key(compile_plan(record["plan"]), generated_on_today())
+    raise ValueError("record needs a 'formData' or 'plan' key")
+
+
+def _render_job(job):
+    name, record = job
+    start = time.perf_counter()
+    try:
+        data = render_record(record)
+    except Exception as e:
+        return name, "error", None, f"{type(e).__name__}: {e}", time.perf_counter() - start
+    return name, "ok", data, None, time.perf_counter() - start
+
+
+class DirectorySink:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+    def exists(self, name):
+        return os.path.exists(os.path.join(self.path, name))
+
+    def write(self, name, data):
+        target = os.path.join(self.path, name)
+        tmp = f"{target}.partial"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, target)
+        return target
+
+    def close(self):
+        pass
+
+
+class TarSink:
+    def __init__(self, fileobj, owned=False):
+        # Stream mode ("w|") never seeks, so this also works on pipes
+        self.fileobj = fileobj
+        self.owned = owned
+        self.tar = tarfile.open(fileobj=fileobj, mode="w|")
+
+    def exists(self, name):
+        return False
+
+    def write(self, name, data):
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        epoch = reproducible.source_date_epoch()
+        info.mtime = int(time.time()) if epoch is None else epoch
+        self.tar.addfile(info, BytesIO(data))
+        return name
+
+    def close(self):
+        self.tar.close()
+        if self.owned:
+            self.fileobj.close()
+        else:
+            self.fileobj.flush()
+
+
+def _ordered(pending):
+    # Pending entries are finished results or futures; resolve them in order
+    entry = pending.popleft()
+    return entry.result() if isinstance(entry, Future) else entry
+
+
+def stream_render(lines, sink, status, workers=1, window=None):
+    """Render every record from ``lines`` into ``sink``, writing JSONL status lines.
+
+    Returns a dict of counts by status.
+    """
+    counts = {"ok": 0, "skipped": 0, "error": 0}
+    window = window or max(1, workers) * 4
+    pool = None
+    if workers > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        pool = ProcessPoolExecutor(max_workers=workers)
+    pending = deque()
+
+    def emit(name, outcome, data, error, seconds):
+        entry = {"id": name[:-4], "status": outcome}
+        if outcome == "ok":
+            entry.update(path=sink.write(name, data), bytes=len(data))
+        elif error is not None:
+            entry["error"] = error
+        if seconds is not None:
+            entry["ms"] = round(seconds * 1000, 1)
+        counts[outcome] += 1
+        status.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        status.flush()
+
+    try:
+        for line_number, line in read_records(lines):
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("record must be a JSON object")
+            except ValueError as e:
+                pending.append((f"line-{line_number:08d}.pdf", "error", None, f"invalid record: {e}", None))
+            else:
+                name = record_name(record, line_number)
+                if sink.exists(name):
+                    pending.append((name, "skipped", None, None, None))
+                elif pool is None:
+                    pending.append(_render_job((name, record)))
+                else:
+                    pending.append(pool.submit(_render_job, (name, record)))
+
+            while len(pending) >= window or (pending and not isinstance(pending[0], Future)):
+                emit(*_ordered(pending))
+
+        while pending:
+            emit(*_ordered(pending))
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+        sink.close()
+
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render a JSONL stream of document specs to PDFs.")
+    parser.add_argument("input", nargs="?", default="-", help="JSONL file, or - for stdin")
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument("--out-dir", help="write PDFs into this directory (resumable)")
+    output.add_argument("--tar", help="write PDFs into a tar file, or - for stdout")
+    parser.add_argument("--status", help="append JSONL status lines to this file (default: stdout)")
+    parser.add_argument("--workers", type=int, default=1, help="render processes (default: 1)")
+    parser.add_argument("--window", type=int, help="max records in flight (default: 4 per worker)")
+    parser.add_argument("--reproducible", action="store_true", help="identical records render to identical bytes (see reproducible.py)")
+    args = parser.parse_args(argv)
+    if args.reproducible:
+        reproducible.enable()
+
+    if args.out_dir:
+        sink = DirectorySink(args.out_dir)
+    elif args.tar == "-":
+        sink = TarSink(sys.stdout.buffer)
+    else:
+        sink = TarSink(open(args.tar, "wb"), owned=True)
+
+    if args.status:
+        status = open(args.status, "a", encoding="utf-8")
+    elif args.tar == "-":
+        # stdout carries the tar stream
+        status = sys.stderr
+    else:
+        status = sys.stdout
+
+    lines = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    with lines:
+        counts = stream_render(lines, sink, status, args.workers, args.window)
+    return 1 if counts["error"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""Lower-memory document builds for very large plans.
+
+``doc.build(story)`` normally gets a list holding every flowable of the
+document, and the canvas keeps every finished page's content stream as text
+until ``save()``. For plans with thousands of phases both grow linearly.
+
+FlowableStream gives ``build()`` the small part of the list interface it
+actually uses, refilled from a generator: only the flowable being laid out
+(plus any keepWithNext chain after it) is alive, and each one is dropped as
+soon as it has been drawn. CompactCanvas runs each finished page's content
+through the stream filters at ``showPage()`` instead of at ``save()``, so
+pages wait for the end of the build compressed. The PDF written is the same
+byte for byte.
+
+Memory is lower, not constant. ReportLab's PDFDocument holds every page
+object and its compressed stream until ``save()`` and then assembles the
+whole file in memory, so a streaming build still grows by roughly 6 KB per
+page (about 17 MB more for a 3000-page plan than for a 10-page one), on top
+of the layout caches, which are bounded by entry count.
+"""
+from collections import deque
+
+from reportlab import rl_config
+from reportlab.pdfbase.pdfdoc import PDFArray, PDFBase85Encode, PDFName, PDFStream, PDFZCompress
+from reportlab.pdfgen.canvas import Canvas
+
+
+class FlowableStream:
+    """Lazily filled stand-in for the flowable list passed to ``doc.build``."""
+
+    def __init__(self, flowables):
+        self._source = iter(flowables)
+        self._buffer = deque()
+
+    def _fill(self, count):
+        while len(self._buffer) < count:
+            try:
+                self._buffer.append(next(self._source))
+            except StopIteration:
+                return False
+        return True
+
+    def __len__(self):
+        # keepWithNext grouping looks at the whole chain and the flowable after it
+        self._fill(1)
+        while self._buffer and self._buffer[-1].getKeepWithNext() and self._fill(len(self._buffer) + 1):
+            pass
+        return len(self._buffer)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            len(self)
+            return list(self._buffer)[index]
+        if not self._fill(index + 1):
+            raise IndexError("flowable stream exhausted")
+        return self._buffer[index]
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            if index.start not in (None, 0) or index.step not in (None, 1):
+                raise TypeError("only leading slices can be deleted from a flowable stream")
+            count = len(self._buffer) if index.stop is None else index.stop
+            for _ in range(count):
+                self._buffer.popleft()
+        elif index == 0:
+            self._buffer.popleft()
+        else:
+            del self._buffer[index]
+
+    def __setitem__(self, index, flowables):
+        # build() only ever pushes split pieces back on the front
+        if not isinstance(index, slice) or index.start not in (None, 0) or index.stop != 0:
+            raise TypeError("flowables can only be pushed onto the front of a flowable stream")
+        self._buffer.extendleft(reversed(list(flowables)))
+
+    def __iter__(self):
+        # Consuming, like build(): for callers such as the TOC page estimate
+        while self._fill(1):
+            yield self._buffer.popleft()
+
+    def insert(self, index, flowable):
+        self._fill(index)
+        self._buffer.insert(index, flowable)
+
+
+class CompactCanvas(Canvas):
+    """Canvas that compresses each page's content stream as soon as the page ends."""
+
+    def showPage(self):
+        Canvas.showPage(self)
+        page = self._doc.Pages.pages[-1]
+        if not page.compression or not page.stream:
+            return
+        # Same filters, and the same output, as PDFPage.check_format at save
+        # time; a stream whose dictionary already names its filters is
+        # written as is
+        filters = [PDFBase85Encode, PDFZCompress] if rl_config.useA85 else [PDFZCompress]
+        content = page.stream
+        for stream_filter in reversed(filters):
+            content = stream_filter.encode(content)
+        stream = PDFStream(content=content)
+        stream.dictionary["Filter"] = PDFArray([PDFName(f.pdfname) for f in filters])
+        stream.__Comment__ = "page stream"
+        page.Contents = stream
+        page.stream = None
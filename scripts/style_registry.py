@@ -0,0 +1,263 @@
+"""Process-wide registry of shared, read-only paragraph styles.
+
+Building a stylesheet means calling getSampleStyleSheet(), constructing
+ParagraphStyle objects and parsing hex colours. Documents that share a look
+also share styles, so the registry builds them once per process (plan
+styles) or once per theme (resume styles, keyed on the template's
+colorScheme, typography and layout), freezes them and hands the same
+instances to every document.
+
+Frozen styles reject attribute assignment. To derive a variant, call
+``style.clone(name, **changes)``, which returns an ordinary ParagraphStyle.
+"""
+from functools import lru_cache
+from types import MappingProxyType
+import json
+
+from reportlab.lib.colors import HexColor
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT, TA_RIGHT
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+
+
+class FrozenParagraphStyle(ParagraphStyle):
+    """A ParagraphStyle that cannot be modified once registered."""
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"style '{self.name}' is shared and read-only; use clone()")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"style '{self.name}' is shared and read-only; use clone()")
+
+    def clone(self, name, parent=None, **kwds):
+        style = ParagraphStyle(name)
+        style.__dict__.update(self.__dict__)
+        style.__dict__.update(name=name, parent=parent)
+        style._setKwds(**kwds)
+        return style
+
+    # ReportLab deep-copies a style before tweaking it (e.g. when splitting
+    # paragraphs with a first-line indent); hand it a mutable copy
+    def __copy__(self):
+        return self.clone(self.name)
+
+    def __deepcopy__(self, memo):
+        return self.clone(self.name)
+
+
+def freeze(style):
+    frozen = object.__new__(FrozenParagraphStyle)
+    frozen.__dict__.update(style.__dict__)
+    # Detach from the (mutable) parent; all inherited values are already copied
+    frozen.__dict__["parent"] = None
+    return frozen
+
+
+@lru_cache(maxsize=None)
+def color(value):
+    """Parse a hex colour once per process."""
+    return HexColor(value)
+
+
+def build_plan_styles():
+    # Get sample styles and create custom styles
+    styles = getSampleStyleSheet()
+    
+    # Custom styles
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Title'],
+        fontSize=24,
+        spaceAfter=30,
+        textColor=color('#1e40af'),
+        alignment=TA_CENTER
+    )
+    
+    heading1_style = ParagraphStyle(
+        'CustomHeading1',
+        parent=styles['Heading1'],
+        fontSize=18,
+        spaceAfter=12,
+        spaceBefore=20,
+        textColor=color('#1e40af'),
+        borderWidth=1,
+        borderColor=color('#dbeafe'),
+        borderPadding=8,
+        backColor=color('#f0f9ff')
+    )
+    
+    heading2_style = ParagraphStyle(
+        'CustomHeading2',
+        parent=styles['Heading2'],
+        fontSize=14,
+        spaceAfter=8,
+        spaceBefore=12,
+        textColor=color('#1f2937'),
+        leftIndent=10
+    )
+    
+    body_style = ParagraphStyle(
+        'CustomBody',
+        parent=styles['Normal'],
+        fontSize=11,
+        spaceAfter=6,
+        alignment=TA_JUSTIFY,
+        leftIndent=20
+    )
+    
+    bullet_style = ParagraphStyle(
+        'BulletStyle',
+        parent=styles['Normal'],
+        fontSize=10,
+        spaceAfter=4,
+        leftIndent=30,
+        bulletIndent=20
+    )
+    
+    toc_style = ParagraphStyle(
+        'TOCEntry',
+        parent=styles['Normal'],
+        fontSize=11,
+        leading=16,
+        leftIndent=10,
+        rightIndent=30
+    )
+    
+    return {
+        "title": title_style,
+        "subtitle": styles['Heading2'],
+        "normal": styles['Normal'],
+        "heading1": heading1_style,
+        "heading2": heading2_style,
+        "body": body_style,
+        "bullet": bullet_style,
+        "toc": toc_style,
+    }
+
+
+@lru_cache(maxsize=None)
+def plan_styles():
+    """Shared plan styles: title, subtitle, normal, heading1, heading2, body, bullet, toc."""
+    return MappingProxyType({key: freeze(style) for key, style in build_plan_styles().items()})
+
+
+# Tailwind sizes used by the templates, in points (matches the print styles
+# in utils/pdf-generator.ts)
+TEXT_SIZES = {
+    "text-xs": 9,
+    "text-sm": 10,
+    "text-base": 11,
+    "text-lg": 13,
+    "text-xl": 15,
+    "text-2xl": 17,
+}
+
+FONT_WEIGHTS = {
+    "font-normal": "Helvetica",
+    "font-medium": "Helvetica",
+    "font-semibold": "Helvetica-Bold",
+    "font-bold": "Helvetica-Bold",
+}
+
+
+def build_resume_styles(template):
+    colors = {key: color(value) for key, value in template["colorScheme"].items()}
+    typography = template["typography"]
+    heading_size = TEXT_SIZES.get(typography["headingSize"], 15)
+    body_size = TEXT_SIZES.get(typography["bodySize"], 10)
+    heading_font = FONT_WEIGHTS.get(typography["headingFont"], "Helvetica-Bold")
+    body_font = FONT_WEIGHTS.get(typography["bodyFont"], "Helvetica")
+    alignment = TA_CENTER if template["headerStyle"] == "center" else TA_LEFT
+
+    section_extra = {}
+    if template["sectionStyle"] == "cards":
+        section_extra = dict(backColor=colors["accent"], borderPadding=(4, 6, 4, 6))
+
+    return {
+        "colors": colors,
+        "name": ParagraphStyle(
+            "ResumeName",
+            fontName="Helvetica-Bold",
+            fontSize=heading_size + 9,
+            leading=heading_size + 13,
+            textColor=colors["primary"],
+            alignment=alignment,
+            spaceAfter=4,
+        ),
+        "contact": ParagraphStyle(
+            "ResumeContact",
+            fontName=body_font,
+            fontSize=body_size,
+            leading=body_size + 4,
+            textColor=colors["secondary"],
+            alignment=alignment,
+        ),
+        "contact_right": ParagraphStyle(
+            "ResumeContactRight",
+            fontName=body_font,
+            fontSize=body_size,
+            leading=body_size + 4,
+            textColor=colors["secondary"],
+            alignment=TA_RIGHT,
+        ),
+        "section": ParagraphStyle(
+            "ResumeSection",
+            fontName=heading_font,
+            fontSize=heading_size,
+            leading=heading_size + 4,
+            textColor=colors["primary"],
+            spaceBefore=12,
+            spaceAfter=6,
+            **section_extra
+        ),
+        "item_title": ParagraphStyle(
+            "ResumeItemTitle",
+            fontName="Helvetica-Bold",
+            fontSize=body_size + 1,
+            leading=body_size + 5,
+            textColor=colors["text"],
+        ),
+        "item_subtitle": ParagraphStyle(
+            "ResumeItemSubtitle",
+            fontName=body_font,
+            fontSize=body_size,
+            leading=body_size + 4,
+            textColor=colors["secondary"],
+            spaceAfter=6,
+        ),
+        "body": ParagraphStyle(
+            "ResumeBody",
+            fontName=body_font,
+            fontSize=body_size,
+            leading=body_size + 4,
+            textColor=colors["text"],
+            spaceAfter=4,
+        ),
+    }
+
+
+def theme_key(template):
+    # Only the parts of a TemplateStyle that affect styles; id/name/thumbnail
+    # changes must not create a new theme
+    return json.dumps(
+        [template["colorScheme"], template["typography"], template["headerStyle"], template["sectionStyle"]],
+        sort_keys=True,
+    )
+
+
+@lru_cache(maxsize=64)
+def _theme_styles(key):
+    colorScheme, typography, headerStyle, sectionStyle = json.loads(key)
+    styles = build_resume_styles({
+        "colorScheme": colorScheme,
+        "typography": typography,
+        "headerStyle": headerStyle,
+        "sectionStyle": sectionStyle,
+    })
+    frozen = {key: freeze(style) for key, style in styles.items() if key != "colors"}
+    frozen["colors"] = MappingProxyType(styles["colors"])
+    return MappingProxyType(frozen)
+
+
+def resume_styles(template):
+    """Shared resume styles for a TemplateStyle, built once per theme."""
+    return _theme_styles(theme_key(template))
@@ -0,0 +1,278 @@
+"""Template picker thumbnails, rendered from the real resume renderer.
+
+Renders a sample resume with every template in ``TEMPLATE_STYLES``
+(types/templates.ts), rasterizes the top of page 1 at the picker's 3:4
+aspect, and writes it at each width and format into public/thumbnails:
+
+    python scripts/template_thumbnails.py
+    python scripts/template_thumbnails.py --workers 4 --force
+
+Page 1 is rasterized once, at the largest width, and scaled down for the
+others. PNGs are quantized to a 256-colour palette and WebPs encoded lossy,
+which keeps a text-heavy page a few KiB at picker sizes.
+
+manifest.json in the output directory records each template's definition
+hash and the files written for it (it doubles as a lookup table for the
+front end). A template whose hash is unchanged and whose files are all
+present is skipped, so a deploy only rasterizes the templates that
+changed. The hash covers the template definition (apart from its
+``thumbnail`` entry, which points at these files), the sample resume and
+the content of its photo, the sizes and formats, THUMBNAIL_VERSION and the
+renderer and ReportLab versions. Unlike render cache keys it leaves out
+font file timestamps and SOURCE_DATE_EPOCH, so a fresh checkout or
+reproducible build does not rasterize every template again. Everything
+runs offline; PyMuPDF rasterizes and Pillow encodes, both
+imported when a thumbnail is actually built.
+"""
+from io import BytesIO
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+import reportlab
+
+from images import source_digest
+from plan_spec import COMPILER_VERSION
+from render_cache import RENDERER_VERSION
+from resume_renderer import load_templates, render_resume
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_DIR = os.path.join(SCRIPTS_DIR, os.pardir, "public", "thumbnails")
+URL_PREFIX = "/thumbnails"
+MANIFEST = "manifest.json"
+
+# Bump whenever the rasterization or encoding changes
+THUMBNAIL_VERSION = 1
+
+DEFAULT_WIDTHS = (150, 300)
+FORMATS = ("webp", "png")
+# Height over width of the picker card
+ASPECT = 4 / 3
+WEBP_QUALITY = 80
+
+SAMPLE_RESUME = {
+    "fullName": "Alex Morgan",
+    "aboutMe": (
+        "Full-stack engineer with seven years of experience building fast, accessible web products. "
+        "Enjoys turning rough ideas into polished, well-tested features."
+    ),
+    "photo": "/placeholder-user.jpg",
+    "skills": ["TypeScript", "React", "Next.js", "Node.js", "Python", "PostgreSQL", "Docker", "AWS"],
+    "experience": [
+        {"company": "Brightline Labs", "role": "Senior Software Engineer", "duration": "2021 - Present"},
+        {"company": "Northwind Digital", "role": "Software Engineer", "duration": "2018 - 2021"},
+    ],
+    "projects": [
+        {
+            "title": "Portfolio Builder",
+            "description": "Resume and portfolio generator with live previews and PDF export.",
+            "techUsed": "Next.js, Tailwind CSS, ReportLab",
+            "githubLink": "https://github.com/alexmorgan/portfolio-builder",
+        },
+        {
+            "title": "Trailhead",
+            "description": "Offline-first hiking planner with route sharing.",
+            "techUsed": "React Native, SQLite",
+            "githubLink": "https://github.com/alexmorgan/trailhead",
+        },
+    ],
+    "education": [
+        {"institution": "University of Washington", "degree": "B.Sc. Computer Science", "year": "2017"},
+    ],
+    "contact": {
+        "email": "alex.morgan@example.com",
+        "phone": "+1 555 0142",
+        "linkedin": "linkedin.com/in/alexmorgan",
+        "github": "github.com/alexmorgan",
+    },
+}
+
+
+def template_hash(template, widths=DEFAULT_WIDTHS, formats=FORMATS):
+    """Identity of a template's thumbnails; unchanged means nothing to rebuild."""
+    definition = {key: value for key, value in template.items() if key != "thumbnail"}
+    images = {field: source_digest(SAMPLE_RESUME[field]) for field in ("photo", "logo") if SAMPLE_RESUME.get(field)}
+    payload = json.dumps(
+        {
+            "template": definition,
+            "sample": SAMPLE_RESUME,
+            "images": images,
+            "widths": list(widths),
+            "formats": list(formats),
+            "version": THUMBNAIL_VERSION,
+            "renderer": [RENDERER_VERSION, COMPILER_VERSION, reportlab.Version],
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def thumbnail_name(template_id, width, fmt):
+    return f"{template_id}-{width}.{fmt}"
+
+
+def _imports():
+    try:
+        import pymupdf
+    except ImportError:
+        try:
+            import fitz as pymupdf
+        except ImportError:
+            raise RuntimeError("PyMuPDF is required to rasterize thumbnails") from None
+    from PIL import Image
+
+    return pymupdf, Image
+
+
+def rasterize(pdf, width):
+    """The top of page 1 of ``pdf`` as a ``width`` x ``width * ASPECT`` RGB image."""
+    pymupdf, Image = _imports()
+    with pymupdf.open(stream=pdf, filetype="pdf") as doc:
+        page = doc[0]
+        zoom = width / page.rect.width
+        clip = pymupdf.Rect(0, 0, page.rect.width, min(page.rect.height, page.rect.width * ASPECT))
+        pixmap = page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), clip=clip, alpha=False)
+        return Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+
+
+def encode(image, fmt):
+    out = BytesIO()
+    if fmt == "png":
+        image.quantize(256).save(out, "PNG", optimize=True)
+    else:
+        image.save(out, "WEBP", quality=WEBP_QUALITY, method=6)
+    return out.getvalue()
+
+
+def build_thumbnails(template, widths=DEFAULT_WIDTHS, formats=FORMATS):
+    """``{file name: bytes}`` of one template's thumbnails."""
+    _, Image = _imports()
+    pdf = render_resume(SAMPLE_RESUME, template)
+    largest = rasterize(pdf, max(widths))
+    files = {}
+    for width in widths:
+        height = round(width * largest.height / largest.width)
+        image = largest if width == largest.width else largest.resize((width, height), Image.LANCZOS)
+        for fmt in formats:
+            files[thumbnail_name(template["id"], width, fmt)] = encode(image, fmt)
+    return files
+
+
+def _write(path, data):
+    tmp = f"{path}.partial"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _build_job(job):
+    # Worker: build one template's thumbnails
+    template, widths, formats = job
+    return template["id"], build_thumbnails(template, widths, formats)
+
+
+def load_manifest(output_dir):
+    try:
+        with open(os.path.join(output_dir, MANIFEST), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"templates": {}}
+
+
+def _up_to_date(entry, digest, output_dir):
+    return (
+        entry is not None
+        and entry["hash"] == digest
+        and all(os.path.exists(os.path.join(output_dir, name)) for name in entry["files"])
+    )
+
+
+def generate_thumbnails(output_dir=OUTPUT_DIR, widths=DEFAULT_WIDTHS, formats=FORMATS, workers=None, force=False):
+    """Bring the thumbnails in ``output_dir`` up to date with types/templates.ts.
+
+    Returns ``{"built": [...], "skipped": [...], "removed": [...]}`` listing
+    template ids. ``workers`` above 1 rasterizes the templates to rebuild in
+    that many processes.
+    """
+    widths = tuple(sorted(set(widths)))
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_manifest(output_dir)
+    entries = manifest["templates"]
+    templates = load_templates()
+
+    hashes = {template_id: template_hash(template, widths, formats) for template_id, template in templates.items()}
+    stale = [
+        (template, widths, formats)
+        for template_id, template in templates.items()
+        if force or not _up_to_date(entries.get(template_id), hashes[template_id], output_dir)
+    ]
+    if workers and workers > 1 and len(stale) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(stale))) as pool:
+            results = list(pool.map(_build_job, stale))
+    else:
+        results = [_build_job(job) for job in stale]
+
+    for template_id, files in results:
+        for name, data in files.items():
+            _write(os.path.join(output_dir, name), data)
+        # Files from an earlier set of sizes or formats
+        for name in set(entries.get(template_id, {}).get("files", ())) - set(files):
+            _remove(os.path.join(output_dir, name))
+        entries[template_id] = {
+            "hash": hashes[template_id],
+            "files": sorted(files),
+            "bytes": sum(map(len, files.values())),
+        }
+
+    removed = sorted(set(entries) - set(templates))
+    for template_id in removed:
+        for name in entries.pop(template_id)["files"]:
+            _remove(os.path.join(output_dir, name))
+
+    manifest["url_prefix"] = URL_PREFIX
+    manifest["templates"] = dict(sorted(entries.items()))
+    _write(os.path.join(output_dir, MANIFEST), (json.dumps(manifest, indent=2) + "\n").encode("utf-8"))
+    built = [template_id for template_id, _ in results]
+    return {
+        "built": built,
+        "skipped": [template_id for template_id in templates if template_id not in built],
+        "removed": removed,
+    }
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render template picker thumbnails from the resume renderer.")
+    parser.add_argument("--out", default=OUTPUT_DIR, help="output directory (default: public/thumbnails)")
+    parser.add_argument("--widths", type=int, nargs="+", default=list(DEFAULT_WIDTHS), help="thumbnail widths in pixels")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--workers", type=int, help="rasterize changed templates in this many processes")
+    parser.add_argument("--force", action="store_true", help="rebuild every template, changed or not")
+    args = parser.parse_args(argv)
+
+    try:
+        result = generate_thumbnails(args.out, args.widths, args.formats, args.workers, args.force)
+    except RuntimeError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    print(
+        f"✅ Thumbnails: {len(result['built'])} built, {len(result['skipped'])} up to date"
+        + (f", {len(result['removed'])} removed" if result["removed"] else "")
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
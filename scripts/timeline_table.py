@@ -0,0 +1,123 @@
+"""Timeline tables that scale to thousands of rows.
+
+A ReportLab Table lays out every row before it can split, and each split
+builds a new Table from the rows that are left, so a schedule with thousands
+of rows costs time quadratic in its length and its header is only drawn on
+the first page. TimelineTable measures the rows once, in fixed-size chunks,
+and keeps running totals of their heights. Splitting is then a binary search:
+each page gets an ordinary Table holding the header plus the rows that fit,
+and the remainder is another TimelineTable sharing the same rows and heights.
+
+Styling is per piece, not per cell: the body is zebra-striped with a single
+ROWBACKGROUNDS command, kept in phase across pages, and the totals row is
+styled only in the piece that ends with it.
+"""
+from bisect import bisect_right
+from itertools import accumulate
+
+from reportlab.lib.colors import black, white
+from reportlab.lib.units import inch
+from reportlab.platypus import Table, TableStyle
+from reportlab.platypus.flowables import Flowable
+
+from style_registry import color
+
+COLUMN_WIDTHS = (2*inch, 1.5*inch, 2.5*inch)
+
+# Timelines longer than this (header and totals included) use TimelineTable
+LARGE_TIMELINE_ROWS = 40
+
+# Rows measured per Table while computing row heights
+MEASURE_CHUNK_ROWS = 256
+
+HEADER_STYLE = (
+    ('BACKGROUND', (0, 0), (-1, 0), color('#1e40af')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), white),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 12),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('GRID', (0, 0), (-1, -1), 1, black),
+)
+
+TOTAL_STYLE = (
+    ('BACKGROUND', (0, -1), (-1, -1), color('#dbeafe')),
+    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+)
+
+ZEBRA = (color('#f8fafc'), white)
+
+
+def _piece(header, rows, first, has_total):
+    # rows are body rows starting at body index ``first``; with has_total the
+    # last of them is the totals row
+    style = list(HEADER_STYLE)
+    last = -2 if has_total else -1
+    if len(rows) > has_total:
+        stripes = ZEBRA[first % 2:] + ZEBRA[:first % 2]
+        style.append(('ROWBACKGROUNDS', (0, 1), (-1, last), stripes))
+    if has_total:
+        style.extend(TOTAL_STYLE)
+    return Table([header] + [list(row) for row in rows], colWidths=COLUMN_WIDTHS, style=TableStyle(style))
+
+
+class TimelineTable(Flowable):
+    """A timeline table that splits across pages in time linear in its rows.
+
+    ``rows`` holds the header row, the body rows and the totals row last.
+    """
+
+    def __init__(self, rows, _shared=None, _start=0):
+        Flowable.__init__(self)
+        self.hAlign = 'CENTER'
+        if _shared is None:
+            header, body = list(rows[0]), rows[1:]
+            _shared = (header, body) + self._measure(header, body)
+        self._shared = _shared
+        self._start = _start
+
+    @staticmethod
+    def _measure(header, body):
+        # Row heights only depend on each row's own text and style, so
+        # measuring in chunks gives the heights the full table would have
+        table = _piece(header, (), 0, False)
+        table.wrap(0, 0)
+        header_height = table._rowHeights[0]
+        heights = []
+        for first in range(0, len(body), MEASURE_CHUNK_ROWS):
+            chunk = body[first:first + MEASURE_CHUNK_ROWS]
+            table = _piece(header, chunk, first, first + len(chunk) == len(body))
+            table.wrap(0, 0)
+            heights.extend(table._rowHeights[1:])
+        # tops[i] is the height of body rows [0, i)
+        return header_height, [0] + list(accumulate(heights))
+
+    def _rows_height(self, stop):
+        tops = self._shared[3]
+        return tops[stop] - tops[self._start]
+
+    def wrap(self, availWidth, availHeight):
+        header, body, header_height, tops = self._shared
+        self.width = sum(COLUMN_WIDTHS)
+        self.height = header_height + self._rows_height(len(body))
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        header, body, header_height, tops = self._shared
+        # Last row end that fits under the header on this page
+        stop = bisect_right(tops, tops[self._start] + availHeight - header_height) - 1
+        if stop <= self._start:
+            return []
+        if stop >= len(body):
+            return [self._table(len(body))]
+        return [self._table(stop), TimelineTable(None, self._shared, stop)]
+
+    def _table(self, stop):
+        header, body = self._shared[:2]
+        return _piece(header, body[self._start:stop], self._start, stop == len(body))
+
+    def draw(self):
+        # Only reached when the rest of the timeline fits on the page
+        table = self._table(len(self._shared[1]))
+        table.wrapOn(self.canv, self.width, self.height)
+        table.drawOn(self.canv, 0, 0)
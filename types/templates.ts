@@ -26,7 +26,7 @@ export const TEMPLATE_STYLES: TemplateStyle[] = [
     id: "modern-professional",
     name: "Modern Professional",
     description: "Clean and professional with blue accents",
-    thumbnail: "/placeholder.svg?height=200&width=150",
+    thumbnail: "/thumbnails/modern-professional-300.webp",
     color: "bg-gradient-to-br from-blue-50 to-indigo-100",
     headerStyle: "center",
     sectionStyle: "bordered",
@@ -48,7 +48,7 @@ export const TEMPLATE_STYLES: TemplateStyle[] = [
     id: "creative-designer",
     name: "Creative Designer",
     description: "Vibrant and creative with purple gradients",
-    thumbnail: "/placeholder.svg?height=200&width=150",
+    thumbnail: "/thumbnails/creative-designer-300.webp",
     color: "bg-gradient-to-br from-purple-50 to-pink-100",
     headerStyle: "left",
     sectionStyle: "cards",
@@ -70,7 +70,7 @@ export const TEMPLATE_STYLES: TemplateStyle[] = [
     id: "tech-developer",
     name: "Tech Developer",
     description: "Modern tech-focused with green accents",
-    thumbnail: "/placeholder.svg?height=200&width=150",
+    thumbnail: "/thumbnails/tech-developer-300.webp",
     color: "bg-gradient-to-br from-green-50 to-emerald-100",
     headerStyle: "split",
     sectionStyle: "minimal",
@@ -92,7 +92,7 @@ export const TEMPLATE_STYLES: TemplateStyle[] = [
     id: "minimalist-clean",
     name: "Minimalist Clean",
     description: "Ultra-clean minimalist design",
-    thumbnail: "/placeholder.svg?height=200&width=150",
+    thumbnail: "/thumbnails/minimalist-clean-300.webp",
     color: "bg-gradient-to-br from-gray-50 to-slate-100",
     headerStyle: "center",
     sectionStyle: "minimal",
@@ -114,7 +114,7 @@ export const TEMPLATE_STYLES: TemplateStyle[] = [
     id: "executive-formal",
     name: "Executive Formal",
     description: "Professional executive style with navy theme",
-    thumbnail: "/placeholder.svg?height=200&width=150",
+    thumbnail: "/thumbnails/executive-formal-300.webp",
     color: "bg-gradient-to-br from-slate-50 to-blue-50",
     headerStyle: "left",
     sectionStyle: "bordered",